@@ -0,0 +1,121 @@
+# Frame-driven card movement.
+#
+# One root.after tick moves every card in flight, so a 28-card deal costs one
+# timer rather than 28 timer chains.  Positions are a function of the clock,
+# not of the number of ticks seen, so a slow frame simply skips ahead instead
+# of making the animation fall behind.  Callers arm the animator for a block of
+# layout changes:
+#
+#     with animator.batch(0.2):
+#         pile.relayout()  # moved cards glide instead of jumping
+#
+# Outside a batch, Pile._place_card moves cards directly and cancels whatever
+# animation they had.
+import time
+from contextlib import contextmanager
+
+FRAME_MS = 16
+
+
+def _ease_out(t):
+    t = 1.0 - t
+    return 1.0 - t * t * t
+
+
+class Animator:
+    def __init__(self, root, canvas, frame_ms=FRAME_MS, clock=time.perf_counter):
+        self.root = root
+        self.canvas = canvas
+        self.frame_ms = frame_ms
+        self.clock = clock
+        self.enabled = True
+        self.tracks = {}  # canvas item -> [x0, y0, x1, y1, start time, duration]
+        self._job = None
+        self._batch = None  # [duration, origin, stagger, next delay] while armed
+
+    @property
+    def armed(self):
+        return self._batch is not None
+
+    @property
+    def busy(self):
+        return bool(self.tracks)
+
+    @contextmanager
+    def batch(self, duration, origin=None, stagger=0.0):
+        # Moves inside the block take `duration` seconds; with an origin, every
+        # item placed starts there, and each successive one leaves `stagger`
+        # seconds later
+        if not self.enabled or duration <= 0 or self._batch is not None:
+            yield
+            return
+        self._batch = [duration, origin, stagger, 0.0]
+        try:
+            yield
+        finally:
+            self._batch = None
+            if self.tracks and self._job is None:
+                self._job = self.root.after(self.frame_ms, self._tick)
+
+    def move(self, item, x0, y0, x1, y1):
+        # Glide item from (x0, y0), or from wherever it is now if it was
+        # already moving, to (x1, y1)
+        duration, _, stagger, delay = self._batch
+        track = self.tracks.get(item)
+        if track is None and x0 == x1 and y0 == y1:
+            return
+        now = self.clock()
+        if track is not None:
+            x0, y0 = self._position(track, now)
+        self.tracks[item] = [x0, y0, x1, y1, now + delay, duration]
+        self._batch[3] = delay + stagger
+
+    def origin(self):
+        return self._batch[1] if self._batch is not None else None
+
+    def cancel(self, item):
+        self.tracks.pop(item, None)
+
+    def finish(self, item=None):
+        # Jump one item (or all of them) to the end of its move
+        items = [item] if item is not None else list(self.tracks)
+        for it in items:
+            track = self.tracks.pop(it, None)
+            if track is not None:
+                self.canvas.coords(it, track[2], track[3])
+
+    def clear(self):
+        # Forget every track without touching the canvas (the caller is about
+        # to place every item again)
+        self.tracks.clear()
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    @staticmethod
+    def _position(track, now):
+        x0, y0, x1, y1, start, duration = track
+        t = (now - start) / duration
+        if t <= 0.0:
+            return x0, y0
+        if t >= 1.0:
+            return x1, y1
+        e = _ease_out(t)
+        return x0 + (x1 - x0) * e, y0 + (y1 - y0) * e
+
+    def _tick(self):
+        self._job = None
+        now = self.clock()
+        coords = self.canvas.coords
+        done = []
+        for item, track in self.tracks.items():
+            if now < track[4]:
+                continue  # staggered and not started yet, still at its origin
+            x, y = self._position(track, now)
+            coords(item, x, y)
+            if now >= track[4] + track[5]:
+                done.append(item)
+        for item in done:
+            del self.tracks[item]
+        if self.tracks:
+            self._job = self.root.after(self.frame_ms, self._tick)
@@ -0,0 +1,111 @@
+# Single-file sprite atlas for deck themes.
+#
+# Layout (little endian):
+#   header  magic "SATL", version u16, reserved u16, sheet width u32,
+#           sheet height u32, entry count u32, data offset u32
+#   index   per entry: name (16 bytes, NUL padded ASCII), x, y, w, h (u32)
+#   data    the sheet as raw, uncompressed RGBA rows, starting at data offset
+#
+# Cells are stacked in one column, so each card is a contiguous byte range of
+# the memory-mapped file and can be handed to PIL without copying or decoding.
+# Names are "<suit>:<rank>" (e.g. "H:10") plus "back".
+import mmap
+import os
+import struct
+
+ATLAS_MAGIC = b"SATL"
+ATLAS_VERSION = 1
+_HEADER = struct.Struct("<4sHHIIII")
+_ENTRY = struct.Struct("<16sIIII")
+_ALIGN = 64
+
+
+def is_atlas(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == ATLAS_MAGIC
+    except OSError:
+        return False
+
+
+def write_atlas(path, cells):
+    # cells: {name: (w, h, rgba bytes)}, all the same size
+    if not cells:
+        raise ValueError("an atlas needs at least one image")
+    sizes = {(w, h) for w, h, _ in cells.values()}
+    if len(sizes) != 1:
+        raise ValueError("all atlas cells must have the same size")
+    (cw, ch), = sizes
+    names = sorted(cells)
+    index_end = _HEADER.size + _ENTRY.size * len(names)
+    data_off = (index_end + _ALIGN - 1) // _ALIGN * _ALIGN
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, 0, cw, ch * len(names), len(names), data_off))
+        for i, name in enumerate(names):
+            f.write(_ENTRY.pack(name.encode("ascii"), 0, i * ch, cw, ch))
+        f.write(b"\0" * (data_off - index_end))
+        for name in names:
+            w, h, data = cells[name]
+            if len(data) != w * h * 4:
+                raise ValueError(f"{name}: expected {w * h * 4} bytes of RGBA")
+            f.write(data)
+    os.replace(tmp, path)
+
+
+class Atlas:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        # A file still being written may stop anywhere: check sizes before
+        # unpacking, so readers only ever see ValueError
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: truncated atlas")
+        magic, version, _, self.sheet_w, self.sheet_h, count, self.data_off = _HEADER.unpack_from(self._map)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {ATLAS_VERSION} card atlas")
+        if _HEADER.size + count * _ENTRY.size > len(self._map):
+            self.close()
+            raise ValueError(f"{path}: truncated atlas")
+        self.rects = {}
+        for i in range(count):
+            raw, x, y, w, h = _ENTRY.unpack_from(self._map, _HEADER.size + i * _ENTRY.size)
+            self.rects[raw.rstrip(b"\0").decode("ascii")] = (x, y, w, h)
+        if self.data_off + self.sheet_w * self.sheet_h * 4 > len(self._map):
+            self.close()
+            raise ValueError(f"{path}: truncated atlas")
+
+    def names(self):
+        return list(self.rects)
+
+    def cell(self, name):
+        # (w, h, RGBA buffer) for one image, or None.  Full-width cells are a
+        # zero-copy view into the mapping; anything else is copied row by row.
+        rect = self.rects.get(name)
+        if rect is None:
+            return None
+        x, y, w, h = rect
+        stride = self.sheet_w * 4
+        start = self.data_off + y * stride
+        view = memoryview(self._map)
+        if x == 0 and w == self.sheet_w:
+            return w, h, view[start:start + h * stride]
+        rows = [view[start + r * stride + x * 4:start + r * stride + (x + w) * 4] for r in range(h)]
+        return w, h, b"".join(rows)
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # PIL images still reference the mapping; it goes away with them
+                pass
+            self._map = None
+        self._file.close()
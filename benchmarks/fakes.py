@@ -0,0 +1,205 @@
+# Display-less stand-ins for the Tk objects SolitaireGame talks to.
+#
+# FakeCanvas implements the part of the tk.Canvas API the game uses, keeps
+# enough state (coordinates, options, tags, stacking order) for scenarios to
+# drive the real handlers, and counts every call so benchmarks can report
+# canvas traffic per operation.
+from collections import Counter
+
+
+class FakeCanvas:
+    def __init__(self, master=None, **options):
+        self.options = dict(options)
+        self.items = {}  # id -> [kind, coords, options, tags, z]
+        self.calls = Counter()
+        self._next = 0
+        self._z = 0
+
+    # -------------------- Widget --------------------
+    def pack(self, **kw):
+        pass
+
+    def bind(self, *args, **kw):
+        pass
+
+    def unbind(self, *args, **kw):
+        pass
+
+    def tag_bind(self, *args, **kw):
+        pass
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    # -------------------- Items --------------------
+    def _create(self, kind, coords, options):
+        self._next += 1
+        self._z += 1
+        tags = options.pop("tags", ())
+        tags = [tags] if isinstance(tags, str) else list(tags)
+        self.items[self._next] = [kind, list(coords), options, tags, self._z]
+        return self._next
+
+    def _ids(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.items)
+        return [i for i, item in self.items.items() if tag_or_id in item[3]]
+
+    def create_image(self, x, y, **options):
+        self.calls["create_image"] += 1
+        return self._create("image", (x, y), options)
+
+    def create_rectangle(self, *coords, **options):
+        self.calls["create_rectangle"] += 1
+        return self._create("rectangle", coords, options)
+
+    def create_text(self, *coords, **options):
+        self.calls["create_text"] += 1
+        return self._create("text", coords, options)
+
+    def coords(self, tag_or_id, *coords):
+        self.calls["coords"] += 1
+        ids = self._ids(tag_or_id)
+        if coords:
+            for i in ids:
+                self.items[i][1] = list(coords)
+        return list(self.items[ids[0]][1]) if ids else []
+
+    def move(self, tag_or_id, dx, dy):
+        self.calls["move"] += 1
+        for i in self._ids(tag_or_id):
+            c = self.items[i][1]
+            c[0] += dx
+            c[1] += dy
+
+    def itemconfigure(self, tag_or_id, **options):
+        self.calls["itemconfigure"] += 1
+        for i in self._ids(tag_or_id):
+            self.items[i][2].update(options)
+
+    def itemconfig(self, tag_or_id, **options):
+        self.calls["itemconfig"] += 1
+        for i in self._ids(tag_or_id):
+            self.items[i][2].update(options)
+
+    def tag_raise(self, tag_or_id, above=None):
+        self.calls["tag_raise"] += 1
+        for i in sorted(self._ids(tag_or_id), key=lambda i: self.items[i][4]):
+            self._z += 1
+            self.items[i][4] = self._z
+
+    def tag_lower(self, tag_or_id, below=None):
+        self.calls["tag_lower"] += 1
+        ids = self._ids(tag_or_id)
+        under = self._ids(below) if below is not None else list(self.items)
+        if not under:
+            return
+        z = min(self.items[i][4] for i in under) - 1
+        for i in sorted(ids, key=lambda i: self.items[i][4], reverse=True):
+            self.items[i][4] = z
+            z -= 1
+
+    def addtag_withtag(self, new_tag, tag_or_id):
+        self.calls["addtag_withtag"] += 1
+        for i in self._ids(tag_or_id):
+            if new_tag not in self.items[i][3]:
+                self.items[i][3].append(new_tag)
+
+    def dtag(self, tag_or_id, tag=None):
+        self.calls["dtag"] += 1
+        tag = tag or tag_or_id
+        for i in self._ids(tag_or_id):
+            if tag in self.items[i][3]:
+                self.items[i][3].remove(tag)
+
+    def gettags(self, item):
+        self.calls["gettags"] += 1
+        return tuple(self.items[item][3]) if item in self.items else ()
+
+    def delete(self, tag_or_id):
+        self.calls["delete"] += 1
+        for i in self._ids(tag_or_id):
+            del self.items[i]
+
+    def find_overlapping(self, x0, y0, x1, y1):
+        # Images are treated as points; good enough for hit counts
+        self.calls["find_overlapping"] += 1
+        hits = [(item[4], i) for i, item in self.items.items()
+                if x0 <= item[1][0] <= x1 and y0 <= item[1][1] <= y1]
+        return tuple(i for _, i in sorted(hits))
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+
+class FakeRoot:
+    # Timers run only when the scenario says so, on a virtual clock
+    def __init__(self):
+        self.bindings = {}
+        self._timers = {}
+        self._next = 0
+
+    def title(self, *args):
+        pass
+
+    def configure(self, **kw):
+        pass
+
+    def resizable(self, *args):
+        pass
+
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+
+    def protocol(self, name, func):
+        self.bindings[name] = func
+
+    def destroy(self):
+        self._timers.clear()
+
+    def after(self, ms, func, *args):
+        self._next += 1
+        self._timers[self._next] = (func, args)
+        return self._next
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job):
+        self._timers.pop(job, None)
+
+    def run_timers(self, rounds=1):
+        # Fire what is due, like one pass of the Tk event loop
+        for _ in range(rounds):
+            if not self._timers:
+                return
+            due, self._timers = self._timers, {}
+            for func, args in due.values():
+                func(*args)
+
+
+class FakeImages:
+    # ImageCache stand-in: strings instead of PhotoImages, nothing decoded
+    def __init__(self, image_dir, card_w, card_h, **kw):
+        self.listeners = []
+        self.back = "back"
+
+    def get_front(self, suit, rank):
+        return f"{rank}{suit}"
+
+    def get_back(self):
+        return self.back
+
+    def set_size(self, w, h):
+        pass
+
+
+class Event:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x, self.y = x, y
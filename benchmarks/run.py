@@ -0,0 +1,221 @@
+# Headless benchmarks for the table view: real piles and handlers, fake canvas.
+#
+#   python benchmarks/run.py              compare against baseline.json
+#   python benchmarks/run.py --update     record a new baseline
+#   python benchmarks/run.py --no-time    only check canvas calls (stable across machines)
+#
+# Each scenario reports wall time and canvas calls per operation.  Canvas call
+# counts are deterministic, so any increase is a regression; wall time only
+# fails past --time-tolerance, as it depends on the machine.  Exits 1 on a
+# regression.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["SOLITAIRE_NO_ANIMATION"] = "1"  # cards jump, so every run does the same work
+os.environ["SOLITAIRE_NO_STATS"] = "1"  # benchmark games are not real games
+
+import engine  # noqa: E402
+import main  # noqa: E402
+from fakes import Event, FakeCanvas, FakeImages, FakeRoot  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SCENARIOS = {}
+
+
+class BenchGame(main.SolitaireGame):
+    canvas_class = FakeCanvas
+    image_cache_class = FakeImages
+
+    def __init__(self, seed=0):
+        self.wins = 0
+        super().__init__(FakeRoot(), image_dir="", seed=seed)
+
+    def notify(self, title, message):
+        self.wins += 1
+
+
+def scenario(name):
+    def deco(func):
+        SCENARIOS[name] = func
+        return func
+    return deco
+
+
+def set_table(game, piles, down=None):
+    # Replace the dealt table with a hand-made one
+    state = game.state
+    state.piles = [bytearray(p) for p in piles]
+    state.down = bytearray(down or engine.NUM_PILES)
+    state.history = engine.MoveLog()
+    game.hints.rebuild()
+    game.sync_piles()
+
+
+def _card(suit_idx, value):
+    return suit_idx * 13 + value - 1
+
+
+# A scenario builds its table (untimed) and returns (operations, run)
+@scenario("deal")
+def deal_scenario(game, scale):
+    seeds = range(50 * scale)
+
+    def run():
+        for seed in seeds:
+            game.new_game(seed)
+    return len(seeds), run
+
+
+@scenario("stock_cycles")
+def stock_cycles_scenario(game, scale):
+    cycles = 1000 * scale
+    ops = cycles * (len(game.stock.cards) + 1)
+
+    def run():
+        for _ in range(ops):
+            game.deal_from_stock()
+    return ops, run
+
+
+@scenario("long_drag")
+def long_drag_scenario(game, scale):
+    # A full king-to-ace run dragged around for 300 motion events, then dropped
+    # where it does not fit so it snaps back
+    run_cards = [_card(3 if v % 2 else 2, v) for v in range(13, 0, -1)]
+    rest = [c for c in range(52) if c not in run_cards]
+    piles = [[] for _ in range(engine.NUM_PILES)]
+    piles[engine.TABLEAUS[0]] = run_cards
+    piles[engine.STOCK] = rest
+    set_table(game, piles)
+    drags = 20 * scale
+    king = game.tableau[0].cards[0]
+
+    def run():
+        for _ in range(drags):
+            x, y = king.x, king.y
+            game.on_click(Event(x, y))
+            for step in range(1, 301):
+                game.on_drag(Event(x + step, y + step // 2))
+                if step % 4 == 0:
+                    game.root.run_timers()
+            game.on_release(Event(x + 300, y + 150))
+    return drags, run
+
+
+@scenario("auto_moves")
+def auto_moves_scenario(game, scale):
+    # Four columns of one suit each, ace on top: 52 double-clicks win the game
+    # (laying out the table again for each round is part of the timing).
+    # Auto-complete is off, or it would play the last columns out in one go
+    # once every card is face up and the clicks would not all be measured.
+    piles = [[] for _ in range(engine.NUM_PILES)]
+    down = bytearray(engine.NUM_PILES)
+    for s in range(4):
+        piles[engine.TABLEAUS[s]] = [_card(s, v) for v in range(13, 0, -1)]
+        down[engine.TABLEAUS[s]] = 12
+    rounds = scale
+    game.auto_complete = lambda: None
+
+    def run():
+        for _ in range(rounds):
+            set_table(game, piles, down)
+            for col in game.tableau[:4]:
+                while col.cards:
+                    top = col.top()
+                    game.on_double_click(Event(top.x, top.y))
+    return 52 * rounds, run
+
+
+@scenario("hit_test")
+def hit_test_scenario(game, scale):
+    rng = random.Random(0)
+    width, height = main.table_size()
+    points = [Event(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(10000 * scale)]
+
+    def run():
+        for p in points:
+            game.card_at(p.x, p.y)
+    return len(points), run
+
+
+def measure(name, scale, repeat):
+    best = None
+    for _ in range(repeat):
+        game = BenchGame(seed=1)
+        ops, run = SCENARIOS[name](game, scale)
+        calls = game.canvas.total_calls()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        calls = game.canvas.total_calls() - calls
+        if best is None or elapsed < best[1]:
+            best = (ops, elapsed, calls)
+    ops, elapsed, calls = best
+    return {"ops": ops, "us_per_op": round(elapsed / ops * 1e6, 2), "canvas_calls_per_op": round(calls / ops, 3)}
+
+
+def compare(name, result, base, time_tolerance, check_time):
+    # Returns a list of regression messages
+    if base is None:
+        return []
+    problems = []
+    if result["canvas_calls_per_op"] > base["canvas_calls_per_op"] + 1e-9:
+        problems.append(f"{name}: canvas calls/op {base['canvas_calls_per_op']} -> {result['canvas_calls_per_op']}")
+    if check_time and result["us_per_op"] > base["us_per_op"] * time_tolerance:
+        problems.append(f"{name}: {base['us_per_op']} -> {result['us_per_op']} us/op "
+                        f"(over {time_tolerance}x the baseline)")
+    return problems
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Solitaire view benchmarks")
+    parser.add_argument("scenarios", nargs="*", help=f"subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the work done per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario (the fastest counts)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--no-time", action="store_true", help="ignore wall time, only compare canvas calls")
+    parser.add_argument("--time-tolerance", type=float, default=2.0, help="fail when slower than this x baseline")
+    args = parser.parse_args(argv)
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    results = {}
+    problems = []
+    print(f"{'scenario':<14}{'ops':>8}{'us/op':>12}{'calls/op':>11}{'baseline us':>13}{'calls':>9}")
+    for name in names:
+        result = measure(name, args.scale, args.repeat)
+        results[name] = result
+        base = baseline.get(name)
+        print(f"{name:<14}{result['ops']:>8}{result['us_per_op']:>12.2f}{result['canvas_calls_per_op']:>11.3f}"
+              + (f"{base['us_per_op']:>13.2f}{base['canvas_calls_per_op']:>9.3f}" if base else f"{'-':>13}{'-':>9}"))
+        problems += compare(name, result, base, args.time_tolerance, not args.no_time)
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    for p in problems:
+        print("REGRESSION", p)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,153 @@
+# Bulk deal generation and layout features for research, vectorized with NumPy.
+#
+#   python main.py bulk -n 1000000 --out deals.npz
+#
+# A batch of deals is an (N, 52) uint8 array of card ids (engine encoding),
+# laid out like Klondike.deal(): positions 0..27 fill columns 1..7 in turn,
+# the last card of each column face up, 28..51 are the stock (51 on top).
+# Features are computed for the whole batch with array operations; nothing
+# here builds a Klondike or a Card per deal.
+#
+# NumPy is optional: it is only imported when this module is used.
+import sys
+import time
+
+import engine
+
+# Deck position -> how many cards of its column lie on top of it
+_COVERED = [c - k for c in range(7) for k in range(c + 1)]
+FACE_UP = [c * (c + 1) // 2 + c for c in range(7)]  # deck positions of the 7 face-up cards
+TABLEAU_CARDS = 28
+NO_CARD = 0xFF
+CHUNK = 1 << 16  # deals per feature pass
+
+FEATURES = ("aces_up", "aces_buried", "ace_depth", "aces_in_stock", "kings_buried", "kings_at_bottom",
+            "first_moves", "stock_color_runs", "stock_longest_run")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("bulk deals need NumPy (pip install numpy)") from None
+    return numpy
+
+
+def random_deals(n, seed=0):
+    # n uniformly shuffled decks from one seeded generator, shuffled row-wise
+    # in a single call; the same (n, seed) always gives the same array
+    np = _numpy()
+    rng = np.random.default_rng(seed)
+    decks = np.tile(np.arange(52, dtype=np.uint8), (n, 1))
+    return rng.permuted(decks, axis=1, out=decks)
+
+
+def numbered_deals(first, n):
+    # The game's own deal numbers first..first+n-1 (as --deal and the title bar
+    # show them).  Uses the engine's shuffle, so it runs at Python speed.
+    np = _numpy()
+    out = np.empty((n, 52), dtype=np.uint8)
+    for i in range(n):
+        out[i] = engine.seeded_deck(first + i)
+    return out
+
+
+def tableau(deals):
+    # (N, 7, 7) columns, bottom card first, padded with NO_CARD
+    np = _numpy()
+    cols = np.full((len(deals), 7, 7), NO_CARD, dtype=np.uint8)
+    for c in range(7):
+        start = c * (c + 1) // 2
+        cols[:, c, :c + 1] = deals[:, start:start + c + 1]
+    return cols
+
+
+def features(deals, chunk=CHUNK):
+    # {name: (N,) uint8 array} of layout features, see FEATURES.  Works
+    # through the batch in chunks so temporaries stay cache-sized.
+    np = _numpy()
+    deals = np.asarray(deals, dtype=np.uint8)
+    out = {name: np.empty(len(deals), dtype=np.uint8) for name in FEATURES}
+    for start in range(0, len(deals), chunk):
+        part = _features(np, deals[start:start + chunk])
+        for name in FEATURES:
+            out[name][start:start + chunk] = part[name]
+    return out
+
+
+def _features(np, deals):
+    rank = deals % 13  # 0 = ace, 12 = king
+    black = (deals // 13) & 1  # suits D C H S: clubs and spades are odd
+    tab_rank = rank[:, :TABLEAU_CARDS]
+    covered = np.asarray(_COVERED, dtype=np.int16)
+    face_down = covered > 0
+    at_bottom = np.zeros(TABLEAU_CARDS, dtype=bool)
+    at_bottom[[c * (c + 1) // 2 for c in range(7)]] = True
+
+    aces = tab_rank == 0
+    kings = tab_rank == 12
+    out = {
+        "aces_up": aces[:, FACE_UP].sum(axis=1),
+        "aces_buried": (aces & face_down).sum(axis=1),
+        "ace_depth": (aces * covered).sum(axis=1),  # cards to clear before every tableau ace is free
+        "aces_in_stock": (rank[:, TABLEAU_CARDS:] == 0).sum(axis=1),
+        # a face-down king above the bottom of its column will need an empty column
+        "kings_buried": (kings & face_down & ~at_bottom).sum(axis=1),
+        "kings_at_bottom": (kings & at_bottom).sum(axis=1),
+    }
+
+    # Face-up cards with a move right away: aces, and cards one lower and of
+    # the other colour than another face-up card
+    up_rank, up_black = rank[:, FACE_UP], black[:, FACE_UP]
+    fits = (up_rank[:, :, None] + 1 == up_rank[:, None, :]) & (up_black[:, :, None] != up_black[:, None, :])
+    out["first_moves"] = (fits.any(axis=2) | (up_rank == 0)).sum(axis=1)
+
+    # Colour runs in the order the stock deals (top first): long single-colour
+    # stretches give fewer cards to build alternating columns from
+    stock_black = black[:, :TABLEAU_CARDS - 1:-1]
+    change = stock_black[:, 1:] != stock_black[:, :-1]
+    out["stock_color_runs"] = change.sum(axis=1) + 1
+    out["stock_longest_run"] = _longest_run(np, change)
+    return out
+
+
+def _longest_run(np, change):
+    # Longest stretch without a change per row, via the index of the last
+    # change seen at each position
+    n, m = change.shape
+    idx = np.arange(1, m + 1)
+    last = np.maximum.accumulate(np.where(change, idx, 0), axis=1)
+    lengths = idx - last + 1
+    return np.maximum(lengths.max(axis=1), 1)
+
+
+# -------------------- Command line --------------------
+def add_parser(subparsers):
+    p = subparsers.add_parser("bulk", help="generate deals in bulk and summarize layout features (needs NumPy)")
+    p.add_argument("-n", "--deals", type=int, default=1_000_000, help="number of deals")
+    p.add_argument("--seed", type=int, default=0, help="generator seed, or first deal number with --numbered")
+    p.add_argument("--numbered", action="store_true", help="use the game's deal numbers (much slower)")
+    p.add_argument("--out", help="save deals and features to this .npz file")
+    p.set_defaults(func=main)
+    return p
+
+
+def main(args):
+    try:
+        np = _numpy()
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    deals = numbered_deals(args.seed, args.deals) if args.numbered else random_deals(args.deals, args.seed)
+    made = time.perf_counter()
+    feats = features(deals)
+    done = time.perf_counter()
+    print(f"{len(deals)} deals in {made - start:.2f}s, features in {done - made:.2f}s")
+    print(f"{'feature':<20}{'mean':>8}{'min':>6}{'max':>6}")
+    for name, values in feats.items():
+        print(f"{name:<20}{values.mean():>8.3f}{values.min():>6}{values.max():>6}")
+    if args.out:
+        np.savez_compressed(args.out, deals=deals, **feats)
+        print(f"saved to {args.out}")
+    return 0
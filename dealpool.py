@@ -0,0 +1,175 @@
+# Pool of deals the solver has proven winnable, filled by a background process.
+#
+# Verified deals are kept in <cache>/dealpool.bin (little endian):
+#   header  magic "SDPL", version u16, reserved u16, deals handed out u64,
+#           next deal number to verify u64
+#   records deal number u64, solution length u16, search nodes u32
+#
+# Records are only appended and handed out in order, so taking a deal is one
+# record read plus a header rewrite.  Only the Tk process writes the file; the
+# worker process just solves deals and reports back through a bounded queue,
+# which also stops it once enough deals are waiting.
+import os
+import queue
+import random
+import struct
+
+import engine
+from resizecache import cache_dir
+
+POOL_MAGIC = b"SDPL"
+POOL_VERSION = 1
+POOL_TARGET = 50  # verified deals to keep in reserve
+_HEADER = struct.Struct("<4sHHQQ")
+_RECORD = struct.Struct("<QHI")
+
+
+class Deal:
+    __slots__ = ("seed", "moves", "nodes")
+
+    def __init__(self, seed, moves, nodes):
+        self.seed = seed
+        self.moves = moves  # length of the solver's solution
+        self.nodes = nodes  # search effort, a rough difficulty measure
+
+    def __repr__(self):
+        return f"Deal({self.seed}, moves={self.moves}, nodes={self.nodes})"
+
+
+class SeedStore:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), "dealpool.bin")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            self._file = open(self.path, "r+b")
+        except FileNotFoundError:
+            self._file = open(self.path, "w+b")
+        header = self._file.read(_HEADER.size)
+        if len(header) == _HEADER.size:
+            magic, version, _, self.taken, self.next_seed = _HEADER.unpack(header)
+            if magic != POOL_MAGIC or version != POOL_VERSION:
+                self._file.close()
+                raise ValueError(f"{self.path}: not a version {POOL_VERSION} deal pool")
+        else:
+            self.taken, self.next_seed = 0, random.randrange(1 << 32)
+            self._write_header()
+        size = os.fstat(self._file.fileno()).st_size - _HEADER.size
+        self.count = size // _RECORD.size  # a torn last record is ignored
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(POOL_MAGIC, POOL_VERSION, 0, self.taken, self.next_seed))
+        self._file.flush()
+
+    def available(self):
+        return self.count - self.taken
+
+    def add(self, seed, moves, nodes):
+        self._file.seek(_HEADER.size + self.count * _RECORD.size)
+        self._file.write(_RECORD.pack(seed, min(moves, 0xFFFF), min(nodes, 0xFFFFFFFF)))
+        self.count += 1
+        self._write_header()
+
+    def skip_to(self, next_seed):
+        # Remember how far verification got, winnable or not
+        if next_seed > self.next_seed:
+            self.next_seed = next_seed
+            self._write_header()
+
+    def take(self):
+        # The next unused verified Deal, or None
+        if self.taken >= self.count:
+            return None
+        self._file.seek(_HEADER.size + self.taken * _RECORD.size)
+        deal = Deal(*_RECORD.unpack(self._file.read(_RECORD.size)))
+        self.taken += 1
+        self._write_header()
+        return deal
+
+    def close(self):
+        self._file.close()
+
+
+def _verify_deals(results, first_seed, max_nodes):
+    # Worker process: solve deals in order forever; put() blocks while the
+    # queue is full, which is what pauses the worker
+    import solver
+    seed = first_seed
+    while True:
+        r = solver.solve(engine.seeded_deck(seed), max_nodes=max_nodes)
+        results.put((seed, r.solved, len(r.moves), r.nodes))
+        seed += 1
+
+
+class DealPool:
+    # Owns the store and the worker.  Call poll() regularly (the game does it
+    # from a Tk timer) to move finished results into the store.
+    def __init__(self, store=None, target=POOL_TARGET, max_nodes=200_000):
+        self.store = store or SeedStore()
+        self.target = target
+        self.max_nodes = max_nodes
+        self._results = None
+        self._worker = None
+
+    def start(self):
+        if self._worker is not None:
+            return
+        import multiprocessing
+        # spawn, not fork: the parent has Tk and loader threads running
+        ctx = multiprocessing.get_context("spawn")
+        self._results = ctx.Queue(maxsize=8)
+        self._worker = ctx.Process(target=_verify_deals, name="solitaire-dealpool", daemon=True,
+                                   args=(self._results, self.store.next_seed, self.max_nodes))
+        self._worker.start()
+
+    def poll(self):
+        # Store what the worker finished; returns the number of new deals
+        if self._results is None:
+            return 0
+        added = 0
+        while self.store.available() < self.target:
+            try:
+                seed, solved, moves, nodes = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if solved:
+                self.store.add(seed, moves, nodes)
+                added += 1
+            self.store.skip_to(seed + 1)
+        return added
+
+    def take(self):
+        return self.store.take()
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.terminate()
+            self._worker.join(1)
+            self._worker = None
+        self.store.close()
+
+
+# -------------------- Command line --------------------
+def add_parser(subparsers):
+    p = subparsers.add_parser("deals", help="show or fill the pool of verified-winnable deals")
+    p.add_argument("--fill", type=int, default=0, help="verify deals until this many are waiting")
+    p.add_argument("--max-nodes", type=int, default=200_000, help="solver budget per deal")
+    p.set_defaults(func=main)
+    return p
+
+
+def main(args):
+    import solver
+    store = SeedStore()
+    try:
+        while store.available() < args.fill:
+            seed = store.next_seed
+            r = solver.solve(engine.seeded_deck(seed), max_nodes=args.max_nodes)
+            if r.solved:
+                store.add(seed, len(r.moves), r.nodes)
+            store.skip_to(seed + 1)
+        print(f"{store.path}: {store.available()} winnable deals waiting, {store.taken} handed out, "
+              f"next deal to verify #{store.next_seed}")
+    finally:
+        store.close()
+    return 0
@@ -0,0 +1,316 @@
+# Headless Klondike rules engine (draw 1, unlimited recycles).
+#
+# The whole table is kept in compact integer arrays so the rules can run
+# without Tk:
+#   * a card is a byte 0..51: suit index * 13 + value - 1 (suits in "DCHS" order)
+#   * every pile is a bytearray listed bottom to top
+#   * `down[p]` is the number of face-down cards at the bottom of pile p
+#     (only tableau piles use it; stock cards are always face down and
+#     waste/foundation cards always face up)
+#
+# A move is a small int: src | dst << 4 | count << 8.  The pile order matches
+# SolitaireGame.all_piles(): stock, waste, 4 foundations, 7 tableaus.
+import random
+from array import array
+
+SUIT_LETTERS = ("D", "C", "H", "S")
+RANK_NAMES = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+
+STOCK = 0
+WASTE = 1
+FOUNDATIONS = (2, 3, 4, 5)
+TABLEAUS = (6, 7, 8, 9, 10, 11, 12)
+NUM_PILES = 13
+
+FLIP_BIT = 1 << 14  # set on history records whose move turned up a tableau card
+
+
+def card_id(suit, rank):
+    return SUIT_LETTERS.index(suit) * 13 + RANK_NAMES.index(rank)
+
+
+def card_suit(c):
+    return c // 13
+
+
+def card_value(c):
+    return c % 13 + 1
+
+
+def card_is_red(c):
+    # diamonds (0) and hearts (2) are red
+    return not (c // 13) & 1
+
+
+def card_name(c):
+    return f"{SUIT_LETTERS[c // 13]}{RANK_NAMES[c % 13]}"
+
+
+def make_move(src, dst, count=1):
+    return src | dst << 4 | count << 8
+
+
+def move_src(m):
+    return m & 0xF
+
+
+def move_dst(m):
+    return (m >> 4) & 0xF
+
+
+def move_count(m):
+    return (m >> 8) & 0x3F
+
+
+DEAL = make_move(STOCK, WASTE, 1)
+
+
+class MoveLog:
+    # Undo/redo log of applied moves packed into 2-byte records (the move plus
+    # FLIP_BIT).  With a cap, the oldest records are dropped in chunks so
+    # memory stays bounded in endless sessions.
+    __slots__ = ("records", "redo", "cap", "dropped")
+
+    def __init__(self, cap=None):
+        self.records = array("H")
+        self.redo = array("H")
+        self.cap = cap
+        self.dropped = 0  # records forgotten because of the cap
+
+    def push(self, rec):
+        self.records.append(rec)
+        if self.cap is not None and len(self.records) > self.cap + max(16, self.cap // 4):
+            extra = len(self.records) - self.cap
+            del self.records[:extra]
+            self.dropped += extra
+
+    def pop(self):
+        return self.records.pop() if self.records else None
+
+    def copy(self):
+        other = MoveLog(self.cap)
+        other.records = array("H", self.records)
+        other.redo = array("H", self.redo)
+        other.dropped = self.dropped
+        return other
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+
+def new_deck(rng=random):
+    deck = list(range(52))
+    rng.shuffle(deck)
+    return deck
+
+
+def seeded_deck(seed):
+    # Deal number -> deck order, reproducible across runs and processes
+    return new_deck(random.Random(seed))
+
+
+class Klondike:
+    __slots__ = ("piles", "down", "history")
+
+    def __init__(self, deck=None, history_cap=None):
+        self.piles = [bytearray() for _ in range(NUM_PILES)]
+        self.down = bytearray(NUM_PILES)
+        self.history = MoveLog(history_cap)  # FLIP_BIT set when a card was turned up
+        if deck is not None:
+            self.deal(deck)
+
+    def deal(self, deck):
+        # Same pattern as the Tk table: columns get 1..7 cards with only the
+        # last one face up, the remaining 24 go to the stock (last = top).
+        deck = bytes(deck)
+        if sorted(deck) != list(range(52)):
+            raise ValueError("deck must be a permutation of 0..51")
+        for p in range(NUM_PILES):
+            self.piles[p] = bytearray()
+            self.down[p] = 0
+        idx = 0
+        for col, p in enumerate(TABLEAUS):
+            self.piles[p] = bytearray(deck[idx:idx + col + 1])
+            self.down[p] = col
+            idx += col + 1
+        self.piles[STOCK] = bytearray(deck[idx:])
+        self.history = MoveLog(self.history.cap)
+
+    def copy(self):
+        other = Klondike.__new__(Klondike)
+        other.piles = [bytearray(p) for p in self.piles]
+        other.down = bytearray(self.down)
+        other.history = self.history.copy()
+        return other
+
+    # -------------------- Queries --------------------
+    def top(self, p):
+        pile = self.piles[p]
+        return pile[-1] if pile else None
+
+    def is_face_up(self, p, index):
+        if p == STOCK:
+            return False
+        return index >= self.down[p]
+
+    def is_won(self):
+        piles = self.piles
+        return len(piles[2]) + len(piles[3]) + len(piles[4]) + len(piles[5]) == 52
+
+    def can_finish(self):
+        # Talon empty and every card face up: the rest plays out to the
+        # foundations without any decision left
+        piles = self.piles
+        return not piles[STOCK] and not piles[WASTE] and not any(self.down) and not self.is_won()
+
+    def finish(self):
+        # Play every remaining card up, lowest first; returns the moves applied.
+        # Only meaningful when can_finish() is true.
+        piles = self.piles
+        moves = []
+        while True:
+            best = None
+            for t in TABLEAUS:
+                if piles[t] and (best is None or piles[t][-1] % 13 < piles[best][-1] % 13):
+                    best = t
+            if best is None:
+                return moves
+            card = piles[best][-1]
+            for f in FOUNDATIONS:
+                if self.fits_foundation(card, f):
+                    break
+            else:
+                return moves
+            move = best | f << 4 | 1 << 8
+            self.apply(move, check=False)
+            moves.append(move)
+
+    def fits_foundation(self, card, p):
+        pile = self.piles[p]
+        if not pile:
+            return card % 13 == 0
+        top = pile[-1]
+        return card == top + 1 and card // 13 == top // 13
+
+    def fits_tableau(self, card, p):
+        pile = self.piles[p]
+        if not pile:
+            return card % 13 == 12
+        top = pile[-1]
+        return top % 13 == card % 13 + 1 and ((top // 13) ^ (card // 13)) & 1 == 1
+
+    def is_legal(self, move):
+        src, dst, n = move & 0xF, (move >> 4) & 0xF, (move >> 8) & 0x3F
+        if src >= NUM_PILES or dst >= NUM_PILES or src == dst or n == 0:
+            return False
+        piles = self.piles
+        if src == STOCK:
+            return dst == WASTE and n == 1 and bool(piles[STOCK])
+        if dst == STOCK:
+            return src == WASTE and not piles[STOCK] and n == len(piles[WASTE])
+        if dst == WASTE:
+            return False
+        pile = piles[src]
+        if len(pile) - self.down[src] < n:
+            return False
+        if dst < 6:
+            return n == 1 and self.fits_foundation(pile[-1], dst)
+        if n > 1 and src < 6:
+            return False
+        return self.fits_tableau(pile[-n], dst)
+
+    def legal_moves(self):
+        piles = self.piles
+        down = self.down
+        moves = []
+        # Foundation moves first: they are never worse than the alternatives
+        for src in (WASTE,) + TABLEAUS:
+            pile = piles[src]
+            if pile:
+                for dst in FOUNDATIONS:
+                    if self.fits_foundation(pile[-1], dst):
+                        moves.append(src | dst << 4 | 1 << 8)
+                        break
+        # Single cards from waste/foundations and any face-up run onto a tableau
+        for src in (WASTE,) + FOUNDATIONS + TABLEAUS:
+            pile = piles[src]
+            if not pile:
+                continue
+            runs = len(pile) - down[src] if src >= 6 else 1
+            for n in range(1, runs + 1):
+                head = pile[-n]
+                for dst in TABLEAUS:
+                    if dst != src and self.fits_tableau(head, dst):
+                        moves.append(src | dst << 4 | n << 8)
+        if piles[STOCK]:
+            moves.append(DEAL)
+        elif piles[WASTE]:
+            moves.append(WASTE | STOCK << 4 | len(piles[WASTE]) << 8)
+        return moves
+
+    # -------------------- Mutation --------------------
+    def apply(self, move, check=True):
+        # Returns True if the move turned up a face-down tableau card.  A new
+        # move makes the redo log meaningless.
+        if check and not self.is_legal(move):
+            raise ValueError(f"illegal move {move:#x}")
+        if self.history.redo:
+            del self.history.redo[:]
+        return self._do(move)
+
+    def _do(self, move):
+        src, dst, n = move & 0xF, (move >> 4) & 0xF, (move >> 8) & 0x3F
+        piles = self.piles
+        sp = piles[src]
+        if src == STOCK:
+            piles[WASTE].append(sp.pop())
+        elif dst == STOCK:
+            # Recycle: waste goes back face down in reverse order
+            piles[STOCK][:] = sp[::-1]
+            del sp[:]
+        else:
+            piles[dst] += sp[-n:]
+            del sp[-n:]
+        flipped = False
+        if src >= 6 and sp and self.down[src] == len(sp):
+            self.down[src] -= 1
+            flipped = True
+        self.history.push(move | FLIP_BIT if flipped else move)
+        return flipped
+
+    def undo(self):
+        # Returns the undone move, or None if there is nothing to undo.  Costs
+        # O(moved cards): the record says exactly what to put back.
+        rec = self.history.pop()
+        if rec is None:
+            return None
+        self.history.redo.append(rec)
+        src, dst, n = rec & 0xF, (rec >> 4) & 0xF, (rec >> 8) & 0x3F
+        piles = self.piles
+        sp = piles[src]
+        if rec & FLIP_BIT:
+            self.down[src] += 1
+        if src == STOCK:
+            sp.append(piles[WASTE].pop())
+        elif dst == STOCK:
+            sp[:] = piles[STOCK][::-1]
+            del piles[STOCK][:]
+        else:
+            dp = piles[dst]
+            sp += dp[-n:]
+            del dp[-n:]
+        return rec & ~FLIP_BIT
+
+    def redo(self):
+        # Re-apply the last undone move; returns it, or None
+        if not self.history.redo:
+            return None
+        move = self.history.redo.pop() & ~FLIP_BIT
+        self._do(move)
+        return move
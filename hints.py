@@ -0,0 +1,127 @@
+# Incrementally maintained "which card is needed where" index over an engine
+# state, for instant hints and "no moves left" detection.
+#
+# Every foundation wants one card (the next of its suit, any ace while empty)
+# and every tableau column wants the two opposite-coloured cards one rank below
+# its top (any king while empty), so at most a few dozen cards are wanted at a
+# time.  A move only changes its source and destination piles, so update()
+# refreshes those two piles' positions and wants; finding a hint is then a
+# lookup per wanted card instead of a scan of every card against every pile.
+import engine
+from engine import FOUNDATIONS, NUM_PILES, STOCK, TABLEAUS, WASTE
+
+_ACES = tuple(s * 13 for s in range(4))
+_KINGS = tuple(s * 13 + 12 for s in range(4))
+
+
+class HintIndex:
+    def __init__(self, state):
+        self.state = state
+        self.where = bytearray(52)  # pile holding each card
+        self.pos = bytearray(52)  # index of each card within that pile
+        self.needs = [() for _ in range(NUM_PILES)]  # cards each pile would accept
+        self.wanted = [set() for _ in range(52)]  # piles that would accept each card
+        self.rebuild()
+
+    def rebuild(self):
+        for p in range(NUM_PILES):
+            self._refresh(p)
+
+    def update(self, move):
+        # Call after a move was applied, undone or redone
+        self._refresh(engine.move_src(move))
+        self._refresh(engine.move_dst(move))
+
+    def _refresh(self, p):
+        pile = self.state.piles[p]
+        where, pos = self.where, self.pos
+        for i, c in enumerate(pile):
+            where[c] = p
+            pos[c] = i
+        for c in self.needs[p]:
+            self.wanted[c].discard(p)
+        needs = self._needs(p, pile)
+        self.needs[p] = needs
+        for c in needs:
+            self.wanted[c].add(p)
+
+    @staticmethod
+    def _needs(p, pile):
+        if p in FOUNDATIONS:
+            if not pile:
+                return _ACES
+            top = pile[-1]
+            return (top + 1,) if top % 13 < 12 else ()
+        if p in TABLEAUS:
+            if not pile:
+                return _KINGS
+            top = pile[-1]
+            v = top % 13
+            if not v:
+                return ()
+            suit = top // 13
+            return ((suit + 1) % 4 * 13 + v - 1, (suit + 3) % 4 * 13 + v - 1)
+        return ()
+
+    # -------------------- Queries --------------------
+    def moves(self):
+        # Useful moves, best first: plays that turn a card up, other foundation
+        # plays, waste plays, emptying a column, then dealing towards a wanted
+        # talon card.  Shuffling runs between columns is never suggested.
+        state = self.state
+        piles = state.piles
+        down = state.down
+        where, pos = self.where, self.pos
+        reveal, found, waste, empty = [], [], [], []
+        seen = set()
+        for dst in FOUNDATIONS + TABLEAUS:
+            for c in self.needs[dst]:
+                src = where[c]
+                if src == dst or (c, src) in seen:
+                    continue
+                i = pos[c]
+                size = len(piles[src])
+                if src == WASTE:
+                    if i != size - 1:
+                        continue
+                    bucket = found if dst in FOUNDATIONS else waste
+                elif src in TABLEAUS:
+                    if i < down[src] or (dst in FOUNDATIONS and i != size - 1):
+                        continue
+                    if i and i == down[src]:
+                        bucket = reveal
+                    elif dst in FOUNDATIONS:
+                        bucket = found
+                    elif i == 0 and c not in _KINGS:
+                        bucket = empty
+                    else:
+                        continue
+                else:
+                    continue
+                move = engine.make_move(src, dst, size - i)
+                if state.is_legal(move):
+                    seen.add((c, src))
+                    bucket.append(move)
+        result = reveal + found + waste + empty
+        if self.talon_wanted():
+            stock = piles[STOCK]
+            result.append(engine.DEAL if stock else engine.make_move(WASTE, STOCK, len(piles[WASTE])))
+        return result
+
+    def talon_wanted(self):
+        # True if dealing (and recycling) can bring up a card some pile wants
+        piles = self.state.piles
+        waste_top = len(piles[WASTE]) - 1
+        for p in FOUNDATIONS + TABLEAUS:
+            for c in self.needs[p]:
+                src = self.where[c]
+                if src == STOCK or (src == WASTE and self.pos[c] != waste_top):
+                    return True
+        return False
+
+    def best(self):
+        moves = self.moves()
+        return moves[0] if moves else None
+
+    def stuck(self):
+        return not self.moves()
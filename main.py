@@ -1,18 +1,32 @@
+import time
+_STARTED = time.perf_counter()  # for the time-to-first-frame metric
+
 import sys
-from pathlib import Path
 import os
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import messagebox
 import random
 import re
-from PIL import Image, ImageTk, ImageDraw, ImageFont
+import queue
+import threading
+import functools
+from collections import OrderedDict
+import animation
+import atlas
+import engine
+import hints
+import manifest
+import profiling
+import stats
+from resizecache import ResizedImageCache
+from engine import Klondike, make_move
+# PIL, the replay and deal-pool modules and the command line are imported
+# where they are used: the first frame only needs Tk
 
 IMAGE_DIR = "/Playing Cards"
 
 SUITS = ["D", "C", "H", "S"]
 RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
-VALUES = {r: (1 if r == "A" else 11 if r == "J" else 12 if r == "Q" else 13 if r == "K" else int(r)) for r in RANKS}
-COLORS = {"D": "red", "H": "red", "C": "black", "S": "black"}
 
 CARD_W = 90
 CARD_H = 130
@@ -24,7 +38,63 @@ TABLEAU_GAP_Y_FACEUP = 28
 TABLEAU_GAP_Y_FACEDOWN = 12
 WASTE_GAP_X = 20
 
+# Unscaled layout; the window can be resized and everything above follows
+_BASE_METRICS = (CARD_W, CARD_H, PADDING_X, PADDING_Y, GAP_X,
+                 TABLEAU_GAP_Y_FACEUP, TABLEAU_GAP_Y_FACEDOWN, WASTE_GAP_X)
+CARD_SIZE_STEP = 6  # card widths are quantized so resizing reuses image sizes
+MIN_CARD_W = 36
+MAX_CACHED_SIZES = 3  # image sets kept for recently used card sizes
+SOURCE_MAX_SCALE = 2  # retained source images are capped at 2x the base size
+RESIZE_DEBOUNCE_MS = 120
+DRAG_FRAME_MS = 16  # pointer motion is coalesced to about one canvas move per frame
+HINT_MS = 1500  # how long a hint stays highlighted
+DEAL_SECONDS = 0.3  # animation lengths; SOLITAIRE_NO_ANIMATION=1 turns them off
+DEAL_STAGGER = 0.025
+SNAP_SECONDS = 0.15
+STOCK_SECONDS = 0.12
+HINT_COLOR = "#ffd700"
+DROP_COLOR = "#ffffff"  # outline of the pile a dragged stack would land on
+
 BG_COLOR = "#0b6623"  # Felt green
+STATUS_TEXT = ("Space: Deal • Double-click: Auto to foundation • H: Hint • Ctrl+Z/Ctrl+Y: Undo/Redo • "
+               "S: Stats • New Game: N (W: winnable only)")
+LOAD_POLL_MS = 15  # how often background-decoded card faces are swapped in
+FRONT_BG = "#c8c8c8"  # placeholder colours, also shown while faces are loading
+BACK_BG = "#323296"
+PLACEHOLDER_FONTS = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+FIRST_FRAME_TARGET_MS = 150
+POOL_POLL_MS = 500  # how often verified deals are collected from the worker process
+THEME_POLL_MS = 1000  # how often a watched deck is checked for edited files
+REPLAY_PAUSE_MS = 2000  # final table of one replay shown before the next starts
+MAX_DEAL = (1 << 64) - 1  # replays store the deal number as a u64
+
+
+def set_card_width(card_w):
+    # Rescale every layout metric to a new card width
+    global CARD_W, CARD_H, PADDING_X, PADDING_Y, GAP_X
+    global TABLEAU_GAP_Y_FACEUP, TABLEAU_GAP_Y_FACEDOWN, WASTE_GAP_X
+    scale = card_w / _BASE_METRICS[0]
+    (CARD_W, CARD_H, PADDING_X, PADDING_Y, GAP_X,
+     TABLEAU_GAP_Y_FACEUP, TABLEAU_GAP_Y_FACEDOWN, WASTE_GAP_X) = (
+        [card_w] + [max(1, round(v * scale)) for v in _BASE_METRICS[1:]])
+
+
+def table_size():
+    # Canvas size needed by the current metrics
+    cols = 7
+    width = PADDING_X * 2 + cols * CARD_W + (cols - 1) * GAP_X
+    height = PADDING_Y * 2 + CARD_H * 2 + 16 + CARD_H + 12 + TABLEAU_GAP_Y_FACEUP * 12
+    return width, height
+
+
+_BASE_TABLE = table_size()
+
+
+def card_width_for(width, height):
+    # Largest quantized card width whose table fits in width x height
+    scale = min(width / _BASE_TABLE[0], height / _BASE_TABLE[1])
+    card_w = int(_BASE_METRICS[0] * scale) // CARD_SIZE_STEP * CARD_SIZE_STEP
+    return max(MIN_CARD_W, card_w)
 
 # Helper maps for tolerant name matching
 _SUITE_WORD = {"D": "diamonds", "C": "clubs", "H": "hearts", "S": "spades"}
@@ -55,13 +125,67 @@ def _levenshtein(a: str, b: str) -> int:
     return prev[-1]
 
 
+@functools.lru_cache(maxsize=None)
+def _placeholder_font(size):
+    # Looked up once per size: a failed truetype() search is slow
+    from PIL import ImageFont
+    for name in PLACEHOLDER_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except (OSError, ImportError):
+            continue
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=4 * 53)
+def _placeholder_image(text, w, h, bg, fg, border, font_size):
+    # PIL rendering of a placeholder card; kept, since every size and every
+    # theme reload asks for the same few dozen
+    from PIL import Image, ImageDraw
+    img = Image.new("RGBA", (w, h), bg)
+    draw = ImageDraw.Draw(img)
+    font = _placeholder_font(font_size)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_w, text_h = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    if border:
+        draw.rectangle([(2, 2), (w - 3, h - 3)], outline=(100, 100, 100, 255), width=3)
+    draw.text(((w - text_w) / 2, (h - text_h) / 2), text, fill=fg, font=font)
+    return img
+
+
 class ImageCache:
-    def __init__(self, image_dir, card_w, card_h):
+    def __init__(self, image_dir, card_w, card_h, disk_cache=None, root=None, load=True,
+                 max_sizes=MAX_CACHED_SIZES):
         self.dir = image_dir
         self.w = card_w
         self.h = card_h
-        self.fronts = {}  # (suit, rank) -> PhotoImage
+        self.fronts = {}  # (suit, rank) -> PhotoImage, for the current size
         self.back = None
+        # With a Tk root, faces are decoded in the background; listeners get
+        # the list of keys ((suit, rank) or "back") whose image was replaced
+        self.root = root
+        self.listeners = []
+        self.pending = 0
+        self.atlas = None  # set when image_dir is a packed .atlas file
+        self.paths = {}  # (suit, rank) or "back" -> source file
+        # Decoded source images kept for resampling to new sizes, and the
+        # PhotoImages of recently used sizes: (w, h) -> {"fronts", "back"}
+        self.sources = {}
+        self.sizes = OrderedDict()
+        self.max_sizes = max_sizes
+        self._blanks = {}  # (w, h, colour) -> plain Tk image shown while loading
+        self._lock = threading.Lock()
+        self._done = queue.Queue()  # finished background decodes
+        self._generation = {}  # (key, w, h) -> number of its latest decode; older results are dropped
+        self._loading = {}  # (w, h) -> keys whose decode for that size has not arrived yet
+        self._stamps = {}  # what the watcher saw last: key, "dir" or "atlas" -> (mtime, size)
+        self._watch_job = None
+        # Already-resized RGBA copies of the card files (SOLITAIRE_NO_CACHE=1 disables)
+        if disk_cache is None and not os.environ.get("SOLITAIRE_NO_CACHE"):
+            disk_cache = ResizedImageCache()
+        self.disk = disk_cache or None
+        if not load:
+            return
         self._load_all()
 
     def _tokens(self, name):
@@ -69,9 +193,10 @@ class ImageCache:
         base = name.lower()
         base = re.sub(r"\.png$|\.jpg$|\.jpeg$", "", base)
         parts = re.split(r"[^a-z0-9]+", base)
-        # strip trailing digits like "...2"
+        # strip trailing digits like "...2" (and drop tokens that were only
+        # digits, an empty token is within one edit of "9")
         parts = [re.sub(r"\d+$", "", p) for p in parts if p]
-        return parts
+        return [p for p in parts if p]
 
     def _find_suit_in_tokens(self, tokens):
         # return suit letter or None
@@ -104,31 +229,80 @@ class ImageCache:
                     return rk
         return None
 
-    @staticmethod
-    def _load_img_from_path(path, w, h):
-        try:
+    def _source(self, key):
+        # Full-quality RGBA source for key, decoded once and kept (files are
+        # capped at SOURCE_MAX_SCALE x the base card size to bound memory)
+        from PIL import Image
+        with self._lock:
+            img = self.sources.get(key)
+        if img is not None:
+            return img
+        if self.atlas is not None:
+            cell = self.atlas.cell("back" if key == "back" else f"{key[0]}:{key[1]}")
+            if cell is None:
+                return None
+            w, h, buf = cell
+            img = Image.frombuffer("RGBA", (w, h), buf, "raw", "RGBA", 0, 1)
+        else:
+            path = self.paths.get(key)
+            if not path:
+                return None
             img = Image.open(path).convert("RGBA")
-            img = img.resize((w, h), Image.LANCZOS)
-            return ImageTk.PhotoImage(img)
+            cap = (int(_BASE_METRICS[0] * SOURCE_MAX_SCALE), int(_BASE_METRICS[1] * SOURCE_MAX_SCALE))
+            if img.width > cap[0] or img.height > cap[1]:
+                img = img.resize(cap, Image.LANCZOS)
+        with self._lock:
+            self.sources[key] = img
+        return img
+
+    def _decode(self, key, w, h):
+        # PIL-only work (safe off the Tk thread): returns an RGBA image of
+        # w x h for key or None
+        from PIL import Image
+        try:
+            path = self.paths.get(key)
+            disk = self.disk if path and self.atlas is None else None
+            data = disk.get(path, w, h, "lanczos") if disk is not None else None
+            if data is not None:
+                return Image.frombuffer("RGBA", (w, h), data, "raw", "RGBA", 0, 1)
+            img = self._source(key)
+            if img is None:
+                return None
+            if img.size != (w, h):
+                img = img.resize((w, h), Image.LANCZOS)
+            if disk is not None:
+                disk.put(path, w, h, "lanczos", img.tobytes())
+            return img
         except Exception:
             return None
 
+    def _load_img(self, key, w, h):
+        from PIL import ImageTk
+        img = self._decode(key, w, h)
+        return ImageTk.PhotoImage(img) if img is not None else None
+
     def _make_placeholder(self, suit, rank, w, h):
         # create a simple placeholder image so the UI stays usable
-        img = Image.new("RGBA", (w, h), (200, 200, 200, 255))
-        draw = ImageDraw.Draw(img)
-        # try a default font; if not available, PIL will use a basic bitmap
-        txt = f"{rank}{suit}"
-        try:
-            font = ImageFont.truetype("arial.ttf", 20)
-        except Exception:
-            font = ImageFont.load_default()
-        bbox = draw.textbbox((0, 0), txt, font=font)
-        text_w, text_h = bbox[2] - bbox[0], bbox[3] - bbox[1]
-        draw.rectangle([(2, 2), (w - 3, h - 3)], outline=(100, 100, 100, 255), width=3)
-        draw.text(((w - text_w) / 2, (h - text_h) / 2), txt, fill=(0, 0, 0), font=font)
-        return ImageTk.PhotoImage(img)
-    def _load_all(self):
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(_placeholder_image(f"{rank}{suit}", w, h, FRONT_BG, (0, 0, 0), True, 20))
+
+    def _make_back_placeholder(self, w, h):
+        # generate simple back placeholder
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(_placeholder_image("BACK", w, h, BACK_BG, (255, 255, 255), False, 18))
+
+    def _blank(self, w, h, color):
+        # Plain Tk image in the placeholder colour: needs no PIL at all
+        img = self._blanks.get((w, h, color))
+        if img is None:
+            img = tk.PhotoImage(width=w, height=h)
+            img.put(color, to=(0, 0, w, h))
+            self._blanks[(w, h, color)] = img
+        return img
+
+    def _resolve_paths(self):
+        # Pick a file for every card and the back without decoding anything.
+        # Returns ({(suit, rank): path or None}, back path or None).
         # scan available files
         files = []
         try:
@@ -171,17 +345,16 @@ class ImageCache:
                 # prefer exact matches that include both words
                 detected[key] = fn
 
-        # load detected images, fallback to common patterns
+        paths = {}
         for s in SUITS:
             for r in RANKS:
                 key = (s, r)
-                img = None
+                path = None
                 # priority 1: detected filename from tokens
                 if key in detected:
                     path = os.path.join(self.dir, detected[key])
-                    img = self._load_img_from_path(path, self.w, self.h)
                 # priority 2: try common naming patterns
-                if img is None:
+                if path is None:
                     candidates = [
                         f"{s}{r}.jpg", f"{s}{r}.png",
                         f"{r}_of_{_SUITE_WORD[s]}.png", f"{r}_of_{_SUITE_WORD[s]}.jpg",
@@ -195,61 +368,257 @@ class ImageCache:
                     for c in candidates:
                         p = os.path.join(self.dir, c)
                         if os.path.exists(p):
-                            img = self._load_img_from_path(p, self.w, self.h)
-                            if img:
-                                break
+                            path = p
+                            break
                 # priority 3: if not found, attempt to use any file that contains suit and rank substrings
-                if img is None:
+                if path is None:
                     for fn in files:
                         low = fn.lower()
                         if (_SUITE_WORD[s] in low or _SUITE_WORD[s][:4] in low) and (
                             _RANK_WORD.get(r, str(r)) in low or (r == "10" and ("10" in low or "io" in low))
                         ):
                             path = os.path.join(self.dir, fn)
-                            img = self._load_img_from_path(path, self.w, self.h)
-                            if img:
-                                break
+                            break
+                paths[key] = path
+
+        # Back image: prefer file with "back", else any "joker", else any image
+        images = [fn for fn in files if fn.lower().endswith((".png", ".jpg", ".jpeg"))]
+        back = next((fn for fn in images if "back" in fn.lower()), None)
+        if back is None:
+            back = next((fn for fn in images if "joker" in fn.lower()), None)
+        if back is None and images:
+            back = images[0]
+        return paths, (os.path.join(self.dir, back) if back else None)
+
+    def rebuild_manifest(self):
+        # Resolve every card file the slow way and store the result
+        paths, back_path = self._resolve_paths()
+        manifest.write_manifest(self.dir, paths, back_path)
+        return paths, back_path
+
+    def _open_theme(self):
+        # Point paths (or the atlas) at the files of self.dir
+        if os.path.isfile(self.dir) and atlas.is_atlas(self.dir):
+            # Slice cards out of a memory-mapped atlas: no per-file open/decode
+            self.atlas = atlas.Atlas(self.dir)
+            self.paths = {(s, r): None for s in SUITS for r in RANKS}
+            self.paths["back"] = None
+            return
+        self.atlas = None
+        # A fresh manifest skips the directory scan and fuzzy matching entirely
+        found = manifest.load_manifest(self.dir)
+        paths, back_path = found if found is not None else self.rebuild_manifest()
+        self.paths = dict(paths)
+        self.paths["back"] = back_path
+
+    def _load_all(self):
+        self._open_theme()
+        if self.root is not None and self.atlas is None:
+            self._load_in_background()
+            return
+        self._build_size(self.w, self.h)
+
+    def _build_size(self, w, h):
+        fronts = {}
+        for s in SUITS:
+            for r in RANKS:
                 # last resort: placeholder (so app doesn't crash)
-                if img is None:
-                    img = self._make_placeholder(s, r, self.w, self.h)
-                self.fronts[key] = img
+                fronts[(s, r)] = self._load_img((s, r), w, h) or self._make_placeholder(s, r, w, h)
+        back = self._load_img("back", w, h) or self._make_back_placeholder(w, h)
+        self._add_size(w, h, fronts, back)
+        if self.disk is not None and not self.pending:
+            self.disk.flush()  # blobs written for this size are only kept once indexed
+
+    def _add_size(self, w, h, fronts, back):
+        self.sizes[(w, h)] = {"fronts": fronts, "back": back}
+        self.sizes.move_to_end((w, h))
+        self.fronts, self.back = fronts, back
+        # Forget the least recently used sizes (the sources stay for resampling)
+        while len(self.sizes) > self.max_sizes:
+            size, _ = self.sizes.popitem(last=False)
+            self._loading.pop(size, None)
+
+    def set_size(self, w, h):
+        # Switch every card image to w x h; returns True if anything changed
+        if (w, h) == (self.w, self.h):
+            return False
+        if self._loading.get((self.w, self.h)):
+            # The size being left never finished decoding: forget it, so
+            # coming back to it decodes again instead of reusing stand-ins
+            self.sizes.pop((self.w, self.h), None)
+            del self._loading[(self.w, self.h)]
+        self.w, self.h = w, h
+        entry = self.sizes.get((w, h))
+        if entry is not None:
+            self.sizes.move_to_end((w, h))
+            self.fronts, self.back = entry["fronts"], entry["back"]
+        elif self.root is not None:
+            # Decode off the Tk thread; cards keep their current images until
+            # the new ones arrive through the listeners
+            self._add_size(w, h, dict(self.fronts), self.back)
+            self._submit(list(self.paths), w, h)
+        else:
+            self._build_size(w, h)
+        return True
 
-        # Back image: prefer file with "back", else any "joker", else any image, else generated
-        back_img = None
-        for fn in files:
-            low = fn.lower()
-            if "back" in low and low.endswith((".png", ".jpg", ".jpeg")):
-                back_img = self._load_img_from_path(os.path.join(self.dir, fn), self.w, self.h)
-                if back_img:
-                    break
-        if back_img is None:
-            for fn in files:
-                low = fn.lower()
-                if "joker" in low and low.endswith((".png", ".jpg", ".jpeg")):
-                    back_img = self._load_img_from_path(os.path.join(self.dir, fn), self.w, self.h)
-                    if back_img:
-                        break
-        if back_img is None and files:
-            # try any image file
-            for fn in files:
-                if fn.lower().endswith((".png", ".jpg", ".jpeg")):
-                    back_img = self._load_img_from_path(os.path.join(self.dir, fn), self.w, self.h)
-                    if back_img:
-                        break
-        if back_img is None:
-            # generate simple back placeholder
-            img = Image.new("RGBA", (self.w, self.h), (50, 50, 150, 255))
-            draw = ImageDraw.Draw(img)
+    # -------------------- Background loading --------------------
+    def _load_in_background(self):
+        # Deal with plain blanks right away; decode on worker threads and swap
+        # the real faces in from the Tk thread as they finish.  Cards whose
+        # file is missing or broken get a labelled placeholder the same way.
+        w, h = self.w, self.h
+        blank = self._blank(w, h, FRONT_BG)
+        fronts = {(s, r): blank for s in SUITS for r in RANKS}
+        self._add_size(w, h, fronts, self._blank(w, h, BACK_BG))
+        self._submit(list(self.paths), w, h)
+
+    def _submit(self, keys, w, h):
+        idle = not self.pending
+        self.pending += len(keys)
+        self._loading.setdefault((w, h), set()).update(keys)
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1, len(keys)))
+        for key in keys:
+            gen = self._generation[(key, w, h)] = self._generation.get((key, w, h), 0) + 1
+            fut = executor.submit(self._decode, key, w, h)
+            fut.add_done_callback(lambda f, key=key, gen=gen: self._done.put((key, gen, w, h, f)))
+        executor.shutdown(wait=False)
+        if idle:
+            self.root.after(LOAD_POLL_MS, self._drain)
+
+    def _drain(self):
+        changed = []
+        while True:
+            try:
+                key, gen, w, h, fut = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            entry = self.sizes.get((w, h))
+            if entry is None or gen != self._generation.get((key, w, h)):
+                continue  # size dropped meanwhile, or the file changed again
+            loading = self._loading.get((w, h))
+            if loading is not None:
+                loading.discard(key)
+                if not loading:
+                    del self._loading[(w, h)]
+            pil_img = None if fut.exception() else fut.result()
+            if pil_img is not None:
+                from PIL import ImageTk
+                photo = ImageTk.PhotoImage(pil_img)
+            elif key == "back":
+                photo = self._make_back_placeholder(w, h)
+            else:
+                photo = self._make_placeholder(*key, w, h)
+            if key == "back":
+                entry["back"] = photo
+            else:
+                entry["fronts"][key] = photo
+            if (w, h) == (self.w, self.h):
+                if key == "back":
+                    self.back = photo
+                changed.append(key)
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+        if self.pending > 0:
+            self.root.after(LOAD_POLL_MS, self._drain)
+        elif self.disk is not None:
+            self.disk.flush()
+
+    # -------------------- Themes and reloading --------------------
+    def reload(self, keys):
+        # Decode these keys again and swap them in (in the background when
+        # there is a root); listeners hear about them like about any load.
+        # Other cached sizes are dropped and rebuilt on the next resize.
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self.sources.pop(key, None)
+        w, h = self.w, self.h
+        entry = self.sizes[(w, h)]
+        self.sizes.clear()
+        self.sizes[(w, h)] = entry
+        self._loading = {size: keys for size, keys in self._loading.items() if size == (w, h)}
+        if self.root is not None:
+            self._submit(keys, w, h)
+            return
+        for key in keys:
+            if key == "back":
+                self.back = entry["back"] = self._load_img(key, w, h) or self._make_back_placeholder(w, h)
+            else:
+                entry["fronts"][key] = self._load_img(key, w, h) or self._make_placeholder(*key, w, h)
+        for listener in self.listeners:
+            listener(list(keys))
+
+    def set_theme(self, image_dir):
+        # Switch to another deck (directory or .atlas file) while running; the
+        # current faces stay up until their replacements are decoded
+        old = self.atlas
+        self.dir = image_dir
+        self._open_theme()
+        if old is not None:
+            old.close()
+        self._stamps = self._stat_theme()
+        self.reload(list(self.paths))
+
+    def watch(self, interval_ms=THEME_POLL_MS):
+        # Poll the deck's files and reload just the ones that change (needs a root)
+        self.unwatch()
+        self._stamps = self._stat_theme()
+        self._watch_job = self.root.after(interval_ms, self._poll_theme, interval_ms)
+
+    def unwatch(self):
+        if self._watch_job is not None:
+            self.root.after_cancel(self._watch_job)
+            self._watch_job = None
+
+    def _poll_theme(self, interval_ms):
+        self._watch_job = self.root.after(interval_ms, self._poll_theme, interval_ms)
+        self.reload(self.changed_keys())
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _stat_theme(self):
+        if self.atlas is not None:
+            return {"atlas": self._stat(self.dir)}
+        stamps = {key: self._stat(path) for key, path in self.paths.items()}
+        stamps["dir"] = self._stat(self.dir)
+        return stamps
+
+    def changed_keys(self):
+        # Keys whose image differs from what the watcher saw last: one stat
+        # per file, plus a new file match when files were added or renamed
+        old = self._stamps
+        if self.atlas is not None:
+            if self._stat(self.dir) == old.get("atlas"):
+                return []
             try:
-                font = ImageFont.truetype("arial.ttf", 18)
-            except Exception:
-                font = ImageFont.load_default()
-            text = "BACK"
-            bbox = draw.textbbox((0, 0), text, font=font)
-            tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
-            draw.text(((self.w - tw) / 2, (self.h - th) / 2), text, fill=(255, 255, 255), font=font)
-            back_img = ImageTk.PhotoImage(img)
-        self.back = back_img
+                new = atlas.Atlas(self.dir)
+            except (OSError, ValueError):
+                return []  # probably still being written; try again next time
+            cur, self.atlas = self.atlas, new
+            names = {key: "back" if key == "back" else f"{key[0]}:{key[1]}" for key in self.paths}
+            changed = [key for key, name in names.items()
+                       if (cur.cell(name) or (0, 0, b""))[2] != (new.cell(name) or (0, 0, b""))[2]]
+            cur.close()
+            self._stamps = self._stat_theme()
+            return changed
+        changed = []
+        if self._stat(self.dir) != old.get("dir"):
+            before = self.paths
+            self._open_theme()
+            changed = [key for key in self.paths if self.paths[key] != before.get(key)]
+        self._stamps = self._stat_theme()
+        changed += [key for key in self.paths if key not in changed and self._stamps[key] != old.get(key)]
+        return changed
 
     def get_front(self, suit, rank):
         return self.fronts.get((suit, rank))
@@ -259,14 +628,18 @@ class ImageCache:
 
 # -------------------- Model --------------------
 class Card:
+    # The 52 cards are made once per table and reused for every deal
+    __slots__ = ("suit", "rank", "face_up", "id", "images", "canvas_item", "drawn",
+                 "x", "y", "pile")
+
     def __init__(self, suit, rank, images, face_up=False):
         self.suit = suit
         self.rank = rank
-        self.value = VALUES[rank]
-        self.color = COLORS[suit]
         self.face_up = face_up
-        self.images = images
+        self.id = engine.card_id(suit, rank)
+        self.images = images  # shared ImageCache; cards hold no images of their own
         self.canvas_item = None
+        self.drawn = None  # (x, y, image, state) last sent to the canvas
         self.x = 0
         self.y = 0
         self.pile = None  # reference to current pile
@@ -287,57 +660,103 @@ class Card:
 
 
 class Pile:
-    def __init__(self, canvas, x, y):
+    def __init__(self, canvas, x, y, index=None, animator=None):
         self.canvas = canvas
         self.x = x
         self.y = y
+        self.index = index  # slot in the engine's pile arrays
+        self.animator = animator
         self.cards = []
         self.outline = None  # for empty pile visual
-
-    def add_cards(self, cards):
-        for c in cards:
-            c.pile = self
-        self.cards.extend(cards)
-        self.relayout()
-
-    def remove_from(self, card):
-        if card not in self.cards:
-            return []
-        idx = self.cards.index(card)
-        moving = self.cards[idx:]
-        self.cards = self.cards[:idx]
-        for c in moving:
-            c.pile = None
-        self.relayout()
-        return moving
+        self.outline_shown = None
 
     def top(self):
         return self.cards[-1] if self.cards else None
 
+    def move_to(self, x, y):
+        # New table position (after a resize); call relayout() afterwards
+        self.x, self.y = x, y
+        if self.outline is not None:
+            self.canvas.coords(self.outline, x - CARD_W // 2, y - CARD_H // 2, x + CARD_W // 2, y + CARD_H // 2)
+
+    def bbox(self):
+        # (x0, y0, x1, y1) of the pile area (covers current stack area)
+        top = self.y - CARD_H // 2
+        return (self.x - CARD_W // 2, top, self.x + CARD_W // 2, top + self.height())
+
     def is_point_inside(self, px, py):
-        # Bounding box of pile area (covers current stack area)
-        w = CARD_W
-        h = self.height()
-        return (self.x - w // 2 <= px <= self.x + w // 2) and (self.y - CARD_H // 2 <= py <= self.y - CARD_H // 2 + h)
+        x0, y0, x1, y1 = self.bbox()
+        return x0 <= px <= x1 and y0 <= py <= y1
 
     def height(self):
         # Default: a single card height
         return CARD_H
+
+    def card_at(self, px, py):
+        # Topmost visible card under the point, from the layout we last drew
+        # (no canvas round-trips)
+        hw, hh = CARD_W / 2, CARD_H / 2
+        for c in reversed(self.cards):
+            drawn = c.drawn
+            if drawn is not None and drawn[3] == "normal" and abs(px - c.x) <= hw and abs(py - c.y) <= hh:
+                return c
+        return None
     def relayout(self):
         # Override in subclasses if needed
+        restack = False
         for c in self.cards:
-            self._place_card(c, self.x, self.y)
+            restack = self._place_card(c, self.x, self.y, restack=restack)
         self._update_outline()
 
-    def _place_card(self, card, x, y):
-        if card.canvas_item is None:
-            card.canvas_item = self.canvas.create_image(x, y, image=card.image(), anchor="center", tags=("card",))
-        else:
-            self.canvas.coords(card.canvas_item, x, y)
+    def _place_card(self, card, x, y, state="normal", restack=False):
+        # Only issue canvas commands for what changed since the card was last
+        # drawn.  Returns True once a card had to be raised: everything above it
+        # in the pile must then be raised too to keep the stacking order.
+        # Hidden cards are left where they are; position, image and stacking
+        # are brought up to date when they come back into view.
+        img = card.image()
         card.x, card.y = x, y
-        self.canvas.tag_raise(card.canvas_item)
-        # Update face image in case flip state changed
-        self.canvas.itemconfig(card.canvas_item, image=card.image())
+        anim = self.animator
+        origin = anim.origin() if anim is not None else None
+        if card.canvas_item is None:
+            sx, sy = origin if origin is not None else (x, y)
+            card.canvas_item = self.canvas.create_image(sx, sy, image=img, anchor="center", tags=("card",), state=state)
+            if origin is not None:
+                anim.move(card.canvas_item, sx, sy, x, y)
+            card.drawn = (x, y, img, state)
+            return True
+        drawn = card.drawn or (None, None, None, None)
+        if state == "hidden":
+            if drawn[3] != "hidden":
+                if anim is not None:
+                    anim.cancel(card.canvas_item)
+                self.canvas.itemconfigure(card.canvas_item, state="hidden")
+            card.drawn = (None, None, drawn[2], "hidden")
+            return restack
+        if origin is not None:
+            # Dealt again: leave from the origin like a newly created card
+            self.canvas.coords(card.canvas_item, *origin)
+            anim.move(card.canvas_item, *origin, x, y)
+            restack = True
+        elif drawn[0] != x or drawn[1] != y:
+            if anim is not None and anim.armed and drawn[0] is not None:
+                anim.move(card.canvas_item, drawn[0], drawn[1], x, y)
+            else:
+                if anim is not None:
+                    anim.cancel(card.canvas_item)
+                self.canvas.coords(card.canvas_item, x, y)
+            restack = True
+        options = {}
+        if drawn[2] is not img:
+            options["image"] = img
+        if drawn[3] != state:
+            options["state"] = state
+        if options:
+            self.canvas.itemconfigure(card.canvas_item, **options)
+        if restack:
+            self.canvas.tag_raise(card.canvas_item)
+        card.drawn = (x, y, img, state)
+        return restack
 
     def _update_outline(self):
         if self.outline is None:
@@ -346,23 +765,20 @@ class Pile:
                 self.x + CARD_W // 2, self.y + CARD_H // 2,
                 outline="#bbbbbb", width=2, dash=(4, 4)
             )
-        if self.cards:
-            self.canvas.itemconfigure(self.outline, state="hidden")
-        else:
-            self.canvas.itemconfigure(self.outline, state="normal")
+        shown = not self.cards
+        if shown != self.outline_shown:
+            self.canvas.itemconfigure(self.outline, state="normal" if shown else "hidden")
+            self.outline_shown = shown
 
 
 class StockPile(Pile):
     def relayout(self):
-        # Stack all at the same position, face-down
-        for c in self.cards:
+        # Stack all at the same position, face-down, only the top visible
+        top = len(self.cards) - 1
+        restack = False
+        for i, c in enumerate(self.cards):
             c.flip_down()
-            self._place_card(c, self.x, self.y)
-        # Ensure only the top is visible
-        for c in self.cards[:-1]:
-            self.canvas.itemconfigure(c.canvas_item, state="hidden")
-        if self.cards:
-            self.canvas.itemconfigure(self.cards[-1].canvas_item, state="normal")
+            restack = self._place_card(c, self.x, self.y, "normal" if i == top else "hidden", restack)
         self._update_outline()
 
 
@@ -373,6 +789,7 @@ class WastePile(Pile):
     def relayout(self):
         # Fan top 3 horizontally
         n = len(self.cards)
+        restack = False
         for i, c in enumerate(self.cards):
             c.flip_up()
             dx = 0
@@ -380,12 +797,9 @@ class WastePile(Pile):
                 dx = max(0, (i - (n - 3))) * WASTE_GAP_X
             elif n == 2:
                 dx = max(0, i - 1) * WASTE_GAP_X
-            self._place_card(c, self.x + dx, self.y)
             # Hide all but last 3
-            if n > 3 and i < n - 3:
-                self.canvas.itemconfigure(c.canvas_item, state="hidden")
-            else:
-                self.canvas.itemconfigure(c.canvas_item, state="normal")
+            state = "hidden" if n > 3 and i < n - 3 else "normal"
+            restack = self._place_card(c, self.x + dx, self.y, state, restack)
         self._update_outline()
 
 
@@ -393,31 +807,13 @@ class FoundationPile(Pile):
     def height(self):
         return CARD_H
 
-    def can_accept(self, card):
-        if not card or isinstance(card, list):
-            return False
-        top = self.top()
-        if top is None:
-            return card.value == 1  # Ace
-        return (card.suit == top.suit) and (card.value == top.value + 1)
-
-    def add_cards(self, cards):
-        # Foundations accept single card at a time
-        if len(cards) != 1:
-            return False
-        card = cards[0]
-        if not self.can_accept(card):
-            return False
-        card.flip_up()
-        super().add_cards([card])
-        return True
-
     def relayout(self):
         # Stack all at the same spot, only top visible
+        top = len(self.cards) - 1
+        restack = False
         for i, c in enumerate(self.cards):
             c.flip_up()
-            self._place_card(c, self.x, self.y)
-            self.canvas.itemconfigure(c.canvas_item, state="hidden" if i < len(self.cards) - 1 else "normal")
+            restack = self._place_card(c, self.x, self.y, "hidden" if i < top else "normal", restack)
         self._update_outline()
 
 
@@ -431,53 +827,43 @@ class TableauPile(Pile):
             total += (TABLEAU_GAP_Y_FACEUP if c.face_up else TABLEAU_GAP_Y_FACEDOWN)
         return total
 
-    @staticmethod
-    def _alternating_colors(c1, c2):
-        return c1.color != c2.color
-
-    def can_accept_head(self, card):
-        top = self.top()
-        if top is None:
-            return card.value == 13  # King
-        return top.face_up and self._alternating_colors(top, card) and (card.value == top.value - 1)
-
-    def add_stack(self, cards):
-        head = cards[0]
-        if not self.can_accept_head(head):
-            return False
-        for c in cards:
-            c.flip_up()
-        for c in cards:
-            c.pile = self
-        self.cards.extend(cards)
-        self.relayout()
-        return True
-
     def relayout(self):
         y = self.y
+        restack = False
         for c in self.cards:
             gap = TABLEAU_GAP_Y_FACEUP if c.face_up else TABLEAU_GAP_Y_FACEDOWN
-            self._place_card(c, self.x, y)
-            self.canvas.itemconfigure(c.canvas_item, state="normal")
+            restack = self._place_card(c, self.x, y, restack=restack)
             y += gap
         self._update_outline()
 
 # -------------------- Game Controller --------------------
 class SolitaireGame:
-    def __init__(self, root):
+    # Swappable for headless runs (see benchmarks/)
+    canvas_class = tk.Canvas
+    image_cache_class = ImageCache
+
+    def __init__(self, root, image_dir=IMAGE_DIR, seed=None, record_dir=None, winnable=False, watch=False):
         self.root = root
         self.root.title("Solitaire (Klondike)")
         self.root.configure(bg=BG_COLOR)
-        self.root.resizable(False, False)
+        self.root.resizable(True, True)
 
         # Compute canvas size based on layout
-        cols = 7
-        width = PADDING_X * 2 + cols * CARD_W + (cols - 1) * GAP_X
-        height = PADDING_Y * 2 + CARD_H * 2 + 16 + CARD_H + 12 + TABLEAU_GAP_Y_FACEUP * 12
-        self.canvas = tk.Canvas(root, width=width, height=height, bg=BG_COLOR, highlightthickness=0)
-        self.canvas.pack()
-
-        self.images = ImageCache(IMAGE_DIR, CARD_W, CARD_H)
+        width, height = table_size()
+        self.table_width = width
+        self.canvas = self.canvas_class(root, width=width, height=height, bg=BG_COLOR, highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        if profiling.ACTIVE is not None:
+            profiling.ACTIVE.count_canvas(self.canvas)
+            self.root.bind("<F12>", lambda _: print("profile written to", profiling.ACTIVE.dump()))
+        self._resize_job = None
+        self.animator = animation.Animator(root, self.canvas)
+        self.animator.enabled = not os.environ.get("SOLITAIRE_NO_ANIMATION")
+
+        self.images = self.image_cache_class(image_dir, CARD_W, CARD_H, root=self.root)
+        self.images.listeners.append(self.refresh_card_images)
+        if watch:
+            self.images.watch()  # edited card files show up while playing
 
         # Piles
         self.stock = None
@@ -488,23 +874,80 @@ class SolitaireGame:
         # Drag state
         self.dragging_stack = []
         self.drag_origin = None
-        self.drag_offsets = []  # per card
-        self.drag_start_mouse = (0, 0)
+        self.drag_start = (0, 0)  # pointer position the drag started at
+        self.drag_last = (0, 0)  # pointer position the dragged group was last moved to
+        self.drag_drawn = []  # what the dragged cards' layout looked like before the drag
+        self.drag_pointer = None  # latest pointer position not yet drawn
+        self._drag_job = None
+        self.drop_targets = []  # [(pile, bbox)] the dragged stack may legally land on
+        self.drop_hover = None  # the entry under the pointer, outlined
+
+        # Deal number and recording of the current game
+        self.seed = seed
+        self.record_dir = record_dir
+        self.recorder = None
+        self._replay_job = None
+        self._hint_job = None
+
+        # Statistics: every finished or abandoned game is stored (SOLITAIRE_NO_STATS=1 disables)
+        self.stats = None
+        if not os.environ.get("SOLITAIRE_NO_STATS"):
+            try:
+                self.stats = stats.StatsStore()
+            except OSError:
+                pass
+        self.game_started = 0.0
+        self.moves_made = 0
+        self.game_recorded = True  # nothing to record before the first deal
+
+        # Verified-winnable deals for N, when that mode is on
+        self.pool = None
+        self._pool_job = None
+        self.deal_info = None
 
         # Buttons
         self._create_ui(width)
 
-        # Set up and deal a new game
-        self.new_game()
+        # Deal the first game
+        self.new_game(seed)
 
-        # Event bindings
+        # Event bindings (made once: cards, items and piles outlive each deal)
         self.canvas.bind("<Button-1>", self.on_click)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.canvas.tag_bind("card", "<Double-Button-1>", self.on_double_click)
         self.root.bind("<space>", lambda _: self.deal_from_stock())
-        self.root.bind("<space>", lambda _: self.deal_from_stock())
+        self.root.bind("n", lambda _: self.deal_next())
         self.root.bind("<Escape>", lambda _: self.cancel_drag())
-    def _create_ui(self, width):
+        self.root.bind("<Control-z>", lambda _: self.undo())
+        self.root.bind("<Control-y>", lambda _: self.redo())
+        self.root.bind("<Control-Z>", lambda _: self.redo())
+        self.root.bind("h", lambda _: self.show_hint())
+        self.root.bind("w", lambda _: self.set_winnable(self.pool is None))
+        self.root.bind("s", lambda _: self.show_stats())
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        if winnable:
+            self.set_winnable(True)
+
+        # The first redraw happens at idle time once the window is mapped; an
+        # idle callback queued from <Map> runs right after it
+        self.first_frame_ms = None
+        self._map_binding = self.canvas.bind("<Map>", self._on_map)
+
+    def _on_map(self, event):
+        self.canvas.unbind("<Map>", self._map_binding)
+        self.root.after_idle(self._first_frame)
+
+    def _first_frame(self):
+        self.first_frame_ms = (time.perf_counter() - _STARTED) * 1000
+        if profiling.ACTIVE is not None:
+            profiling.ACTIVE.metrics["time_to_first_frame_ms"] = round(self.first_frame_ms, 1)
+        if os.environ.get("SOLITAIRE_TIMING"):
+            print(f"first frame after {self.first_frame_ms:.0f} ms (target {FIRST_FRAME_TARGET_MS} ms)",
+                  file=sys.stderr)
+        self.canvas.bind("<Configure>", self.on_configure)
+
+    def _compute_positions(self, width):
         # Positions
         top_y = PADDING_Y + CARD_H // 2
         left_x = PADDING_X + CARD_W // 2
@@ -522,76 +965,336 @@ class SolitaireGame:
         tab_y = top_y + CARD_H + 40
         self.tableau_positions = [(tx0 + i * (CARD_W + GAP_X), tab_y) for i in range(7)]
 
+    def _create_ui(self, width):
+        self._compute_positions(width)
+
         # Top UI text
         self.status_text = self.canvas.create_text(
-            width // 2, PADDING_Y // 2 + 6, text="Space: Deal • Double-click: Auto to foundation • New Game: N",
+            width // 2, PADDING_Y // 2 + 6, text=STATUS_TEXT,
             fill="#ffffff", font=("Segoe UI", 10))
-        self.root.bind("n", lambda _: self.new_game())
-        self.canvas.delete("all")
-        # Recreate status text
-        width = int(self.canvas["width"])
-        self.status_text = self.canvas.create_text(
-            width // 2, PADDING_Y // 2 + 6, text="Space: Deal • Double-click: Auto to foundation • New Game: N",
-            fill="#ffffff", font=("Segoe UI", 10)
-        )
-        self.stock = StockPile(self.canvas, *self.stock_pos)
-        self.waste = WastePile(self.canvas, *self.waste_pos)
-        self.foundations = [FoundationPile(self.canvas, *pos) for pos in self.foundation_positions]
-        self.tableau = [TableauPile(self.canvas, *pos) for pos in self.tableau_positions]
-
-        # Build, shuffle, deal
-        deck = [Card(s, r, self.images, face_up=False) for s in SUITS for r in RANKS]
-        random.shuffle(deck)
-
-        # Deal to tableau: 1..7 with last face up
-        deal_idx = 0
-        for col in range(7):
-            stack = []
-            for row in range(col + 1):
-                c = deck[deal_idx]
-                deal_idx += 1
-                # Only last card face up
-                c.face_up = (row == col)
-                stack.append(c)
-            self.tableau[col].add_cards(stack)
-
-        # Remaining cards to stock
-        remain = deck[deal_idx:]
-        self.stock.add_cards(remain)
-
-        # Draw dummy outlines for target areas
-        # Already handled by piles' _update_outline()
-
-        # Re-bind events (canvas was recreated)
-        self.canvas.tag_bind("card", "<Button-1>", self.on_click)
-        self.canvas.tag_bind("card", "<B1-Motion>", self.on_drag)
-        self.canvas.tag_bind("card", "<ButtonRelease-1>", self.on_release)
-        self.canvas.tag_bind("card", "<Double-Button-1>", self.on_double_click)
 
-    def new_game(self):
-        # Reset game by clearing and rebuilding the layout and dealing a fresh deck
-        width = int(self.canvas["width"])
-        self.dragging_stack = []
-        self.drag_origin = None
-        self.drag_offsets = []
-        self._create_ui(width)
+        # Piles and cards; each card gets its canvas item on its first deal
+        anim = self.animator
+        self.stock = StockPile(self.canvas, *self.stock_pos, index=engine.STOCK, animator=anim)
+        self.waste = WastePile(self.canvas, *self.waste_pos, index=engine.WASTE, animator=anim)
+        self.foundations = [FoundationPile(self.canvas, *pos, index=i, animator=anim)
+                            for i, pos in zip(engine.FOUNDATIONS, self.foundation_positions)]
+        self.tableau = [TableauPile(self.canvas, *pos, index=i, animator=anim)
+                        for i, pos in zip(engine.TABLEAUS, self.tableau_positions)]
+        self.cards = [Card(s, r, self.images, face_up=False) for s in SUITS for r in RANKS]
+
+        # Drop target outline, moved around while dragging
+        self.drop_outline = self.canvas.create_rectangle(0, 0, 0, 0, outline=DROP_COLOR, width=3, state="hidden")
+
+    def _deal(self):
+        # Shuffle and deal (the engine owns the rules, piles only mirror it)
+        if self.seed is None:
+            self.seed = random.randrange(1 << 32)
+        self.state = Klondike(engine.seeded_deck(self.seed))
+        self.root.title(f"Solitaire (Klondike) - Deal #{self.seed}" + (self.deal_info or ""))
+        self.hints = hints.HintIndex(self.state)
+        # Cards fly out of the stock one after the other
+        with self.animator.batch(DEAL_SECONDS, origin=self.stock_pos, stagger=DEAL_STAGGER):
+            self.sync_piles()
+
+    def new_game(self, seed=None, record=True):
+        # Deal the given deal number (a random one if None) with the same
+        # cards, canvas items and piles
+        self._end_drag()
+        self.stop_replay()
+        self.clear_hint()
+        self.record_game(False)
+        self.animator.clear()  # every card is placed again below
+        self.seed = seed
+        self._deal()
+        self._start_recording(record)
+        # Replays are shown, not played: they stay out of the statistics
+        self.game_started = time.time()
+        self.moves_made = 0
+        self.game_recorded = not record
+
+    def close(self):
+        self.record_game(False)
+        self.stop_replay()
+        self.set_winnable(False)
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if self.stats is not None:
+            self.stats.close()
+        self.root.destroy()
+
+    # -------------------- Statistics --------------------
+    def record_game(self, won):
+        # Store the current game once: when it is won, or abandoned after a move
+        if self.game_recorded or not (won or self.moves_made):
+            return
+        self.game_recorded = True
+        if self.stats is not None:
+            self.stats.record(self.seed, self.game_started, time.time() - self.game_started,
+                              self.moves_made, won)
+
+    def show_stats(self):
+        if self.stats is not None:
+            self.notify("Statistics", stats.describe(self.stats))
+
+    # -------------------- Winnable deals --------------------
+    def set_winnable(self, on):
+        # Deal only solver-verified games on N; a worker process keeps the pool full
+        if on and self.pool is None:
+            import dealpool
+            try:
+                pool = dealpool.DealPool()
+            except (OSError, ValueError):
+                # Unwritable cache or a damaged pool file: keep dealing any game
+                self.flash_status("Winnable deals are unavailable")
+                return
+            try:
+                pool.start()
+            except OSError:
+                pool.close()
+                self.flash_status("Winnable deals are unavailable")
+                return
+            self.pool = pool
+            self._pool_job = self.root.after(POOL_POLL_MS, self._poll_pool)
+        elif not on and self.pool is not None:
+            # Stop the poll chain too, or toggling W quickly would run two
+            if self._pool_job is not None:
+                self.root.after_cancel(self._pool_job)
+                self._pool_job = None
+            self.pool.close()
+            self.pool = None
+
+    def _poll_pool(self):
+        self._pool_job = None
+        if self.pool is not None:
+            self.pool.poll()
+            self._pool_job = self.root.after(POOL_POLL_MS, self._poll_pool)
+
+    def deal_next(self):
+        # N: a verified deal straight from the pool in winnable mode, else any deal
+        if self.pool is None:
+            self.new_game()
+            return
+        self.pool.poll()
+        deal = self.pool.take()
+        if deal is None:
+            # Keep the current game rather than deal one nobody has verified
+            self.flash_status("No verified deal ready yet • W: any deal")
+            return
+        self.deal_info = f" (winnable in {deal.moves} moves)"
+        self.new_game(deal.seed)
+        self.deal_info = None
+
+    def _start_recording(self, record):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if record and self.record_dir:
+            import replay
+            os.makedirs(self.record_dir, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.seed}{replay.REPLAY_SUFFIX}"
+            self.recorder = replay.ReplayWriter(os.path.join(self.record_dir, name), self.seed)
+
+    # -------------------- Replays --------------------
+    def play_replay(self, path, delay_ms=300, then=None):
+        # Show a recording on the table, one event every delay_ms; `then` is
+        # called a moment after the last one
+        import replay
+        rec = replay.Replay(path)
+        self.new_game(rec.seed, record=False)
+        self._replay_step(iter(rec), delay_ms, then)
+
+    def play_replays(self, paths, delay_ms=300):
+        # Show recordings one after another, pausing on each final table
+        if paths:
+            self.play_replay(paths[0], delay_ms, lambda: self.play_replays(paths[1:], delay_ms))
+
+    def _replay_step(self, events, delay_ms, then=None):
+        self._replay_job = None
+        event = next(events, None)
+        if event is None:
+            self.check_win()
+            if then is not None:
+                self._replay_job = self.root.after(REPLAY_PAUSE_MS, then)
+            return
+        import replay
+        try:
+            move = replay.apply_event(self.state, event)
+        except ValueError:
+            return  # the table was played on meanwhile; the rest no longer applies
+        if move is not None:
+            with self.animator.batch(min(SNAP_SECONDS, delay_ms / 2000)):
+                self._moved(move)
+        self._replay_job = self.root.after(delay_ms, self._replay_step, events, delay_ms, then)
+
+    def stop_replay(self):
+        if self._replay_job is not None:
+            self.root.after_cancel(self._replay_job)
+            self._replay_job = None
+
+    # -------------------- Resizing --------------------
+    def on_configure(self, event):
+        # Window edges fire <Configure> continuously while dragged: wait for a pause
+        if self._resize_job is not None:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(RESIZE_DEBOUNCE_MS, self._apply_resize, event.width, event.height)
+
+    def _apply_resize(self, width, height):
+        self._resize_job = None
+        card_w = card_width_for(width, height)
+        if card_w == CARD_W and width == self.table_width:
+            return
+        self.cancel_drag()
+        self.animator.finish()
+        set_card_width(card_w)
+        self.images.set_size(CARD_W, CARD_H)
+        self.table_width = width
+        self._compute_positions(width)
+        self.canvas.coords(self.status_text, width // 2, PADDING_Y // 2 + 6)
+        positions = [self.stock_pos, self.waste_pos] + self.foundation_positions + self.tableau_positions
+        for pile, pos in zip(self.all_piles(), positions):
+            pile.move_to(*pos)
+            pile.relayout()
 
     # -------------------- Helpers --------------------
     def all_piles(self):
         return [self.stock, self.waste] + self.foundations + self.tableau
 
+    def refresh_card_images(self, keys=None):
+        # Push newly available images to the cards showing them; only the
+        # cards of the given keys unless the back changed
+        cards = self.cards
+        if keys is not None and "back" not in keys:
+            cards = [cards[engine.card_id(*key)] for key in keys]
+        for c in cards:
+            drawn = c.drawn
+            if c.canvas_item is None or (drawn is not None and drawn[3] == "hidden"):
+                continue  # hidden cards get their image when shown again
+            img = c.image()
+            if drawn is None or drawn[2] is not img:
+                self.canvas.itemconfig(c.canvas_item, image=img)
+                if drawn is not None:
+                    c.drawn = (drawn[0], drawn[1], img, drawn[3])
+
+    def sync_piles(self, *piles):
+        # Copy engine state into the view piles (all of them if none given)
+        for pile in piles or self.all_piles():
+            ids = self.state.piles[pile.index]
+            cards = [self.cards[i] for i in ids]
+            for i, c in enumerate(cards):
+                c.face_up = self.state.is_face_up(pile.index, i)
+                c.pile = pile
+            pile.cards = cards
+            pile.relayout()
+
+    def play(self, src, dst, count=1):
+        # Apply a move to the engine and refresh the two piles it touched
+        move = make_move(src.index, dst.index, count)
+        if not self.state.is_legal(move):
+            return False
+        self.state.apply(move, check=False)
+        self.moves_made += 1
+        if self.recorder is not None:
+            self.recorder.record(move)
+        self._moved(move)
+        if self.state.can_finish():
+            self.auto_complete()
+        return True
+
+    def auto_complete(self):
+        # Play the solved table out in the engine first, then redraw the
+        # foundations and columns once
+        moves = self.state.finish()
+        if not moves:
+            return
+        self.moves_made += len(moves)
+        if self.recorder is not None:
+            for m in moves:
+                self.recorder.record(m)
+        self.clear_hint()
+        self.hints.rebuild()
+        self.sync_piles(*self.foundations, *self.tableau)
+
+    def _moved(self, move):
+        # Bring the hint index and the two touched piles up to date after the
+        # engine applied, undid or redid `move`
+        self.clear_hint()
+        self.hints.update(move)
+        piles = self.all_piles()
+        self.sync_piles(piles[engine.move_src(move)], piles[engine.move_dst(move)])
+
+    def undo(self):
+        # Take back the last move; only the two piles it touched are redrawn
+        self.cancel_drag()
+        move = self.state.undo()
+        if move is not None:
+            if self.recorder is not None:
+                self.recorder.undo()
+            self._moved(move)
+
+    def redo(self):
+        self.cancel_drag()
+        move = self.state.redo()
+        if move is not None:
+            if self.recorder is not None:
+                self.recorder.redo()
+            self._moved(move)
+            self.check_win()
+
+    # -------------------- Hints --------------------
+    def show_hint(self):
+        # Outline the best move's cards and target, or say that nothing helps
+        self.clear_hint()
+        move = self.hints.best()
+        if move is None:
+            self.canvas.itemconfigure(self.status_text, text="No useful moves left • New Game: N")
+        else:
+            piles = self.all_piles()
+            src, dst = piles[engine.move_src(move)], piles[engine.move_dst(move)]
+            if src is self.waste and dst is self.stock:
+                boxes = [self._pile_box(self.stock)]
+            elif src is self.stock:
+                boxes = [self._pile_box(src)]
+            else:
+                head = src.cards[-engine.move_count(move)]
+                boxes = [self._card_box(head), self._pile_box(dst)]
+            for box in boxes:
+                self.canvas.create_rectangle(*box, outline=HINT_COLOR, width=3, tags=("hint",))
+        self._hint_job = self.root.after(HINT_MS, self.clear_hint)
+
+    def flash_status(self, text):
+        # Show a message in the status line until the hint timer restores it
+        self.clear_hint()
+        self.canvas.itemconfigure(self.status_text, text=text)
+        self._hint_job = self.root.after(HINT_MS, self.clear_hint)
+
+    def clear_hint(self):
+        if self._hint_job is not None:
+            self.root.after_cancel(self._hint_job)
+            self._hint_job = None
+            self.canvas.delete("hint")
+            self.canvas.itemconfigure(self.status_text, text=STATUS_TEXT)
+
+    @staticmethod
+    def _card_box(card):
+        return (card.x - CARD_W // 2, card.y - CARD_H // 2, card.x + CARD_W // 2, card.y + CARD_H // 2)
+
+    def _pile_box(self, pile):
+        top = pile.top()
+        if top is None:
+            return (pile.x - CARD_W // 2, pile.y - CARD_H // 2, pile.x + CARD_W // 2, pile.y + CARD_H // 2)
+        return self._card_box(top)
+
     def card_at(self, x, y):
-        # Return topmost visible card under point
-        items = self.canvas.find_overlapping(x, y, x, y)
-        items = [i for i in items if "card" in self.canvas.gettags(i)]
-        if not items:
-            return None
-        # Last in list is topmost
-        top_item = items[-1]
-        # Map canvas item to Card
+        # Return topmost visible card under point.  Piles never overlap, so the
+        # first pile whose columns contain x decides.
+        hw = CARD_W / 2
         for pile in self.all_piles():
-            for c in pile.cards:
-                if c.canvas_item == top_item and self.canvas.itemcget(c.canvas_item, "state") == "normal":
+            right = pile.x + hw + (2 * WASTE_GAP_X if pile is self.waste else 0)
+            if pile.x - hw <= x <= right:
+                c = pile.card_at(x, y)
+                if c is not None:
                     return c
         return None
 
@@ -599,43 +1302,44 @@ class SolitaireGame:
         if not self.dragging_stack:
             return
         # Snap back to origin pile layout
-        self.drag_origin.relayout()
-        self.dragging_stack = []
-        self.drag_origin = None
-        self.drag_offsets = []
+        self._restore_drawn()
+        with self.animator.batch(SNAP_SECONDS):
+            self.drag_origin.relayout()
+        self._end_drag()
+
+    def _restore_drawn(self):
+        # Tell the dragged cards where they really are on the canvas, so the
+        # relayout after a drop can animate them from there
+        dx = self.drag_last[0] - self.drag_start[0]
+        dy = self.drag_last[1] - self.drag_start[1]
+        for c, drawn in zip(self.dragging_stack, self.drag_drawn):
+            if c.drawn is None and drawn is not None:
+                c.drawn = (drawn[0] + dx, drawn[1] + dy, drawn[2], drawn[3])
 
     def try_auto_move_to_foundation(self, card):
+        # Only the top card of a pile can go up
+        from_pile = card.pile
+        if from_pile is None or card is not from_pile.top():
+            return False
         for f in self.foundations:
-            if f.can_accept(card):
-                # Remove from current pile
-                from_pile = card.pile
-                moving = from_pile.remove_from(card)
-                if len(moving) != 1:
-                    # If it was a stack, move only card
-                    moving = [card]
-                ok = f.add_cards([moving[0]])
-                if not ok:
-                    # put back
-                    from_pile.add_cards([moving[0]])
-                    return False
-                # Flip origin top if needed
-                if isinstance(from_pile, TableauPile) or isinstance(from_pile, WastePile) or isinstance(from_pile, FoundationPile):
-                    top = from_pile.top()
-                    if top and not top.face_up and not isinstance(from_pile, FoundationPile):
-                        top.flip_up()
-                        self.canvas.itemconfig(top.canvas_item, image=top.image())
+            if self.play(from_pile, f):
                 self.check_win()
                 return True
         return False
 
     def check_win(self):
         if all(len(f.cards) == 13 for f in self.foundations):
-            messagebox.showinfo("You win!", "Congratulations! You completed the game.")
+            self.record_game(True)
+            self.notify("You win!", "Congratulations! You completed the game.")
             return True
         return False
 
+    def notify(self, title, message):
+        messagebox.showinfo(title, message)
+
     # -------------------- Event Handlers --------------------
     def on_click(self, event):
+        self.clear_hint()
         x, y = event.x, event.y
         # Click stock to deal
         if self.stock.is_point_inside(x, y):
@@ -657,110 +1361,127 @@ class SolitaireGame:
             if c != pile.top():
                 return
             stack = [c]
-            offsets = [(c.x - x, c.y - y)]
         elif isinstance(pile, FoundationPile):
             # Allow dragging top card back to tableau
             if c != pile.top():
                 return
             stack = [c]
-            offsets = [(c.x - x, c.y - y)]
         elif isinstance(pile, TableauPile):
             # Can drag any face-up stack (sequence validation happens on drop)
             idx = pile.cards.index(c)
-            # Ensure clicked card is face up
+            # Face-down cards cannot be dragged (the engine turns tops up itself)
             if not c.face_up:
-                # If it's face-down top, flip it
-                if c == pile.top():
-                    c.flip_up()
-                    self.canvas.itemconfig(c.canvas_item, image=c.image())
                 return
             stack = pile.cards[idx:]
-            # Compute offsets for each in stack
-            offsets = []
-            base_dx = c.x - x
-            base_dy = c.y - y
-            # Respect tableau gaps for visual during drag
-            for i, sc in enumerate(stack):
-                dy = base_dy + i * TABLEAU_GAP_Y_FACEUP
-                offsets.append((base_dx, dy))
         else:
             return
 
         # Start dragging
         self.dragging_stack = stack
         self.drag_origin = pile
-        self.drag_offsets = offsets
-        self.drag_start_mouse = (x, y)
+        self.drag_start = self.drag_last = (x, y)
+        self.drag_pointer = None
 
-        # Raise dragged items above others
+        # Tag the stack as one group and raise it once; its canvas position
+        # will no longer match the layout, so the next relayout must redraw it
+        self.canvas.dtag("drag", "drag")
+        self.drag_drawn = []
         for sc in stack:
-            self.canvas.tag_raise(sc.canvas_item)
+            self.animator.finish(sc.canvas_item)
+            self.canvas.addtag_withtag("drag", sc.canvas_item)
+            self.drag_drawn.append(sc.drawn)
+            sc.drawn = None
+        self.canvas.tag_raise("drag")
+
+        # Where the stack may go cannot change until it is dropped: find the
+        # legal piles and their areas once, so motion and release only
+        # compare against a few boxes
+        n = len(stack)
+        candidates = (self.foundations if n == 1 else []) + self.tableau
+        self.drop_targets = [(p, p.bbox()) for p in candidates
+                             if self.state.is_legal(make_move(pile.index, p.index, n))]
+
+    def _drop_target(self, x, y):
+        # The drop_targets entry under (x, y): a foundation first, else the
+        # column whose centre is closest
+        best = None
+        for entry in self.drop_targets:
+            x0, y0, x1, y1 = entry[1]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                pile = entry[0]
+                if isinstance(pile, FoundationPile):
+                    return entry
+                if best is None or abs(pile.x - x) < abs(best[0].x - x):
+                    best = entry
+        return best
+
+    def _show_drop(self, entry):
+        # Outline the pile under the pointer, just below the dragged cards
+        if entry is None:
+            self.canvas.itemconfigure(self.drop_outline, state="hidden")
+        else:
+            self.canvas.coords(self.drop_outline, *entry[1])
+            if self.drop_hover is None:
+                self.canvas.itemconfigure(self.drop_outline, state="normal")
+            self.canvas.tag_lower(self.drop_outline, "drag")
+        self.drop_hover = entry
 
     def on_drag(self, event):
         if not self.dragging_stack:
             return
-        x, y = event.x, event.y
-        for (dx, dy), c in zip(self.drag_offsets, self.dragging_stack):
-            self.canvas.coords(c.canvas_item, x + dx, y + dy)
+        # Only remember the pointer; the group is moved at most once per frame
+        self.drag_pointer = (event.x, event.y)
+        if self._drag_job is None:
+            self._drag_job = self.root.after(DRAG_FRAME_MS, self._flush_drag)
+
+    def _flush_drag(self):
+        self._drag_job = None
+        if not self.dragging_stack or self.drag_pointer is None:
+            return
+        (x, y), (lx, ly) = self.drag_pointer, self.drag_last
+        if x != lx or y != ly:
+            self.canvas.move("drag", x - lx, y - ly)
+            self.drag_last = (x, y)
+        self.drag_pointer = None
+        entry = self._drop_target(x, y)
+        if entry is not self.drop_hover:
+            self._show_drop(entry)
+
+    def _end_drag(self):
+        if self._drag_job is not None:
+            self.root.after_cancel(self._drag_job)
+            self._drag_job = None
+        if self.drop_hover is not None:
+            self._show_drop(None)
+        self.canvas.dtag("drag", "drag")
+        self.dragging_stack = []
+        self.drag_drawn = []
+        self.drag_origin = None
+        self.drag_pointer = None
+        self.drop_targets = []
 
     def on_release(self, event):
         if not self.dragging_stack:
             return
         x, y = event.x, event.y
-        stack = self.dragging_stack
-        head = stack[0]
+        n = len(self.dragging_stack)
         origin = self.drag_origin
-
-        # Try foundations first if single card
-        target = None
-        if len(stack) == 1:
-            for f in self.foundations:
-                if f.is_point_inside(x, y) and f.can_accept(head):
-                    target = f
-                    break
-
-        # Then tableau
-        if target is None:
-            legal_tableaus = []
-            for t in self.tableau:
-                if t.is_point_inside(x, y) and t.can_accept_head(head):
-                    legal_tableaus.append(t)
-            if legal_tableaus:
-                # If multiple candidates, pick the one whose x is closest to mouse
-                target = sorted(legal_tableaus, key=lambda p: abs(p.x - x))[0]
-
-        moved = False
-        if target is not None:
-            # Execute move
-            moving = origin.remove_from(head)
-            if target in self.foundations:
-                if len(moving) != 1:
-                    moving = [head]
-                moved = target.add_cards([moving[0]])
-                if not moved:
-                    # put back
-                    origin.add_cards(moving)
-            elif isinstance(target, TableauPile):
-                moved = target.add_stack(moving)
-                if not moved:
-                    origin.add_cards(moving)
-
-        if not moved:
-            # Snap back
-            origin.relayout()
-        else:
-            # Flip origin's new top if needed
-            if isinstance(origin, TableauPile):
-                top = origin.top()
-                if top and not top.face_up:
-                    top.flip_up()
-                    self.canvas.itemconfig(top.canvas_item, image=top.image())
+        entry = self._drop_target(x, y)
+        target = entry[0] if entry is not None else None
+        if len(origin.cards) < n or origin.cards[-n] is not self.dragging_stack[0]:
+            target = None  # the origin pile changed under the drag: snap back
+
+        self._restore_drawn()
+        with self.animator.batch(SNAP_SECONDS):
+            moved = target is not None and self.play(origin, target, n)
+            if not moved:
+                # Snap back
+                origin.relayout()
+        if moved:
             self.check_win()
 
         # Clear drag state
-        self.dragging_stack = []
-        self.drag_origin = None
-        self.drag_offsets = []
+        self._end_drag()
 
     def on_double_click(self, event):
         c = self.card_at(event.x, event.y)
@@ -772,29 +1493,130 @@ class SolitaireGame:
     # -------------------- Game Mechanics --------------------
     def deal_from_stock(self):
         # If stock has cards, move one to waste and flip
-        if self.stock.cards:
-            c = self.stock.cards.pop()
-            c.flip_up()
-            c.pile = self.waste
-            self.waste.cards.append(c)
-            # Show previous stock top
-            self.stock.relayout()
-            self.waste.relayout()
-        else:
-            # Recycle waste to stock (face-down, reverse order)
-            if not self.waste.cards:
-                return
-            moving = list(reversed(self.waste.cards))
-            self.waste.cards = []
-            for c in moving:
-                c.flip_down()
-                c.pile = self.stock
-            self.stock.cards.extend(moving)
-            self.stock.relayout()
-            self.waste.relayout()
+        self.cancel_drag()
+        with self.animator.batch(STOCK_SECONDS):
+            if self.stock.cards:
+                self.play(self.stock, self.waste)
+            else:
+                # Recycle waste to stock (face-down, reverse order)
+                if not self.waste.cards:
+                    return
+                self.play(self.waste, self.stock, len(self.waste.cards))
+
+
+SUBCOMMANDS = {"simulate": "simulate", "deals": "dealpool", "stats": "stats", "bulk": "bulk", "replay": "replay"}
+
+
+def deal_number(text):
+    # argparse type for --deal: any number a replay can record
+    import argparse
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid deal number: {text!r}") from None
+    if not 0 <= seed <= MAX_DEAL:
+        raise argparse.ArgumentTypeError(f"deal numbers run from 0 to {MAX_DEAL}")
+    return seed
+
+
+def build_manifest(args):
+    paths, back = ImageCache(args.dir, CARD_W, CARD_H, disk_cache=False, load=False).rebuild_manifest()
+    missing = [f"{r}{s}" for (s, r), p in paths.items() if p is None]
+    print(f"{manifest.manifest_path(args.dir)}: {len(paths) - len(missing)} cards, back={back}")
+    if missing:
+        print("missing (placeholders will be used): " + " ".join(missing))
+    return 0
+
+
+def build_atlas(args):
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    cache = ImageCache(args.dir, w, h, disk_cache=False, load=False)
+    found = manifest.load_manifest(args.dir)
+    paths, back = found if found is not None else cache.rebuild_manifest()
+    cache.paths = dict(paths)
+    cache.paths["back"] = back
+    cells = {}
+    for key in cache.paths:
+        img = cache._decode(key, w, h)
+        if img is not None:
+            cells["back" if key == "back" else f"{key[0]}:{key[1]}"] = (w, h, img.tobytes())
+    atlas.write_atlas(args.out, cells)
+    missing = sorted({"back" if k == "back" else f"{k[0]}:{k[1]}" for k in cache.paths} - set(cells))
+    print(f"{args.out}: {len(cells)} images of {w}x{h}" + (f", missing {' '.join(missing)}" if missing else ""))
+    return 0
+
+
+def enable_profiling(path):
+    # Time the event handlers, hit-testing, every pile relayout and image loading
+    targets = [(SolitaireGame, name) for name in ("on_click", "on_drag", "on_release", "card_at", "deal_from_stock")]
+    targets += [(cls, "relayout") for cls in (Pile, StockPile, WastePile, FoundationPile, TableauPile)]
+    targets.append((ImageCache, "_load_all"))
+    return profiling.enable(targets, path)
+
+
+def show_replay(args):
+    import replay
+    if args.headless:
+        return replay.main(args)
+    # Check every header before the window opens, not when its turn comes
+    for path in args.files:
+        try:
+            replay.Replay(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+    root = tk.Tk()
+    game = SolitaireGame(root, image_dir=args.cards)
+    game.play_replays(args.files, args.speed)
+    root.mainloop()
+    return 0
+
+
+def main(argv=None):
+    import argparse
+    import importlib
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description="Solitaire (Klondike)")
+    sub = parser.add_subparsers(dest="command")
+    # Subcommand modules are only imported when named (or for --help), so
+    # starting the game loads none of them
+    wanted = set(SUBCOMMANDS) if {"-h", "--help"} & set(argv) else set(argv)
+    for name, module in SUBCOMMANDS.items():
+        if name in wanted:
+            p = importlib.import_module(module).add_parser(sub)
+            if name == "replay":
+                p.set_defaults(func=show_replay)
+    p = sub.add_parser("manifest", help="precompile the card image manifest for faster startup")
+    p.add_argument("--dir", default=IMAGE_DIR, help="card image directory")
+    p.set_defaults(func=build_manifest)
+    p = sub.add_parser("atlas", help="pack a card image directory into a single .atlas file")
+    p.add_argument("--dir", default=IMAGE_DIR, help="card image directory")
+    p.add_argument("--out", required=True, help="atlas file to write")
+    p.add_argument("--size", default=f"{CARD_W}x{CARD_H}", help="cell size WxH (default: card size)")
+    p.set_defaults(func=build_atlas)
+    parser.add_argument("--cards", default=IMAGE_DIR, help="card image directory or .atlas file")
+    parser.add_argument("--deal", type=deal_number, default=None, help="deal number to play (default: random)")
+    parser.add_argument("--record", metavar="DIR", default=os.environ.get("SOLITAIRE_RECORD_DIR"),
+                        help="write a replay of every game into DIR")
+    parser.add_argument("--timing", action="store_true", help="print the time to the first frame")
+    parser.add_argument("--winnable", action="store_true", help="N deals only solver-verified games (toggle: W)")
+    parser.add_argument("--watch", action="store_true", help="reload card images as their files change")
+    parser.add_argument("--profile", metavar="FILE", nargs="?", const=profiling.DEFAULT_PATH,
+                        default=os.environ.get("SOLITAIRE_PROFILE"),
+                        help=f"time hot paths and write a JSON report at exit or on F12 (default {profiling.DEFAULT_PATH})")
+    args = parser.parse_args(argv)
+    if args.timing:
+        os.environ["SOLITAIRE_TIMING"] = "1"
+    if args.profile:
+        enable_profiling(profiling.DEFAULT_PATH if args.profile == "1" else args.profile)
+    if args.command is not None:
+        return args.func(args)
+    root = tk.Tk()
+    game = SolitaireGame(root, image_dir=args.cards, seed=args.deal, record_dir=args.record,
+                         winnable=args.winnable, watch=args.watch)
+    root.mainloop()
+    return 0
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    game = SolitaireGame(root)
-    root.mainloop()
+    sys.exit(main())
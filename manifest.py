@@ -0,0 +1,70 @@
+# Precompiled asset manifest: which file holds each card face and the back.
+#
+# Fuzzy filename matching is slow, so the result is written once (by
+# `python main.py manifest` or on the first start) and reused for as long as
+# the directory's mtime is unchanged, i.e. no file was added, removed or
+# renamed.  Manifests live in the cache directory, one per asset directory.
+import hashlib
+import json
+import os
+
+from resizecache import cache_dir
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(image_dir, root=None):
+    key = hashlib.sha1(os.path.abspath(image_dir).encode("utf-8")).hexdigest()
+    return os.path.join(root or cache_dir(), "manifests", key + ".json")
+
+
+def _dir_mtime(image_dir):
+    try:
+        return os.stat(image_dir).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_manifest(image_dir, root=None):
+    # Returns ({(suit, rank): path or None}, back path or None), or None if
+    # there is no manifest or it is stale
+    mtime = _dir_mtime(image_dir)
+    if mtime is None:
+        return None
+    try:
+        with open(manifest_path(image_dir, root), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (data.get("version") != MANIFEST_VERSION or data.get("dir") != os.path.abspath(image_dir)
+            or data.get("dir_mtime_ns") != mtime):
+        return None
+    paths = {}
+    for key, fn in data["cards"].items():
+        suit, rank = key.split(":")
+        paths[(suit, rank)] = os.path.join(image_dir, fn) if fn else None
+    back = data.get("back")
+    return paths, (os.path.join(image_dir, back) if back else None)
+
+
+def write_manifest(image_dir, paths, back, root=None):
+    mtime = _dir_mtime(image_dir)
+    if mtime is None:
+        return None
+    data = {
+        "version": MANIFEST_VERSION,
+        "dir": os.path.abspath(image_dir),
+        "dir_mtime_ns": mtime,
+        "cards": {f"{s}:{r}": (os.path.basename(p) if p else None) for (s, r), p in paths.items()},
+        "back": os.path.basename(back) if back else None,
+    }
+    path = manifest_path(image_dir, root)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        return None
+    return path
@@ -0,0 +1,136 @@
+# Opt-in instrumentation for the hot paths of the game.
+#
+#   python main.py --profile [out.json]      or   SOLITAIRE_PROFILE=out.json
+#
+# enable() swaps timing wrappers into the given classes, so nothing is wrapped
+# and nothing is paid unless profiling was asked for.  Per wrapped method it
+# keeps a call count, a log-bucketed latency histogram (p50/p95/p99 without
+# storing samples) and how many Tcl canvas calls happened inside it.  The
+# report is written as JSON at exit and whenever dump() is called (F12 in the
+# game).
+import atexit
+import functools
+import json
+import math
+import time
+
+DEFAULT_PATH = "solitaire-profile.json"
+ACTIVE = None  # the running Profiler, if profiling is on
+
+# Canvas methods that end up as Tcl calls in this code base
+CANVAS_METHODS = ("addtag_withtag", "coords", "create_image", "create_rectangle", "create_text", "delete",
+                  "dtag", "find_overlapping", "gettags", "itemconfig", "itemconfigure", "move", "tag_lower",
+                  "tag_raise")
+
+_BUCKETS_PER_OCTAVE = 8
+
+
+class Histogram:
+    # Latencies in microseconds, bucketed at 1/8 octave (~9% wide buckets)
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, us):
+        b = int(math.log2(us) * _BUCKETS_PER_OCTAVE) if us >= 1.0 else 0
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= rank:
+                return min(2 ** ((b + 1) / _BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+
+class Profiler:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.stats = {}  # label -> [Histogram, canvas calls]
+        self.canvas_calls = {}  # canvas method -> count
+        self.metrics = {}  # one-off measurements, e.g. time to first frame
+        self.tcl = 0  # running total of canvas calls
+
+    def wrap(self, cls, name, label=None):
+        # Replace cls.name with a timing wrapper
+        func = cls.__dict__[name]
+        label = label or f"{cls.__name__}.{name}"
+        stat = self.stats.setdefault(label, [Histogram(), 0])
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tcl = self.tcl
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stat[0].add((clock() - start) / 1000)
+                stat[1] += self.tcl - tcl
+
+        setattr(cls, name, wrapper)
+
+    def count_canvas(self, canvas):
+        # Count Tcl round-trips made through this canvas instance
+        for name in CANVAS_METHODS:
+            method = getattr(canvas, name, None)
+            if method is not None:
+                setattr(canvas, name, self._counting(name, method))
+
+    def _counting(self, name, method):
+        calls = self.canvas_calls
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            self.tcl += 1
+            calls[name] = calls.get(name, 0) + 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    def report(self):
+        handlers = {}
+        for label, (hist, tcl) in sorted(self.stats.items()):
+            if not hist.count:
+                continue
+            handlers[label] = {
+                "calls": hist.count,
+                "total_ms": round(hist.total / 1000, 3),
+                "mean_us": round(hist.total / hist.count, 1),
+                "p50_us": round(hist.percentile(50), 1),
+                "p95_us": round(hist.percentile(95), 1),
+                "p99_us": round(hist.percentile(99), 1),
+                "max_us": round(hist.max, 1),
+                "canvas_calls": tcl,
+                "canvas_calls_per_call": round(tcl / hist.count, 2),
+            }
+        return {"handlers": handlers, "canvas_calls": dict(sorted(self.canvas_calls.items())),
+                "metrics": self.metrics}
+
+    def dump(self, path=None):
+        path = path or self.path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1)
+        return path
+
+
+def enable(targets, path=DEFAULT_PATH):
+    # targets: [(class, method name), ...].  Returns the active Profiler.
+    global ACTIVE
+    if ACTIVE is None:
+        ACTIVE = Profiler(path)
+        atexit.register(ACTIVE.dump)
+    for cls, name in targets:
+        ACTIVE.wrap(cls, name)
+    return ACTIVE
@@ -0,0 +1,155 @@
+# Compact binary game recordings.
+#
+# Layout (little endian):
+#   header  magic "SRPL", version u8, reserved u8 + u16, deal seed u64
+#   events  one byte (src << 4 | dst) per move, followed by a count byte only
+#           for tableau-to-tableau moves and waste recycles; every other move
+#           moves exactly one card.  UNDO and REDO are single bytes whose
+#           source nibble is not a pile.
+#
+# Files are appended to (and flushed) move by move, so a crashed session still
+# leaves a usable recording, and they are read back in small chunks, so even
+# very long recordings never have to fit in memory.
+import struct
+
+import engine
+from engine import STOCK, TABLEAUS, WASTE, Klondike
+
+REPLAY_MAGIC = b"SRPL"
+REPLAY_VERSION = 1
+REPLAY_SUFFIX = ".srpl"
+_HEADER = struct.Struct("<4sBBHQ")
+UNDO = 0xF0
+REDO = 0xF1
+_CHUNK = 1 << 16
+
+
+def _needs_count(src, dst):
+    return (src in TABLEAUS and dst in TABLEAUS) or (src == WASTE and dst == STOCK)
+
+
+def encode_move(move):
+    src, dst, n = engine.move_src(move), engine.move_dst(move), engine.move_count(move)
+    if _needs_count(src, dst):
+        return bytes((src << 4 | dst, n))
+    if n != 1:
+        raise ValueError(f"move {move:#x} must move exactly one card")
+    return bytes((src << 4 | dst,))
+
+
+class ReplayWriter:
+    def __init__(self, path, seed):
+        if not 0 <= seed < 1 << 64:
+            raise ValueError(f"deal {seed} does not fit a replay header")
+        self.path = path
+        self.seed = seed
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, 0, 0, seed))
+        self._file.flush()
+
+    def _write(self, data):
+        if self._file is not None:
+            self._file.write(data)
+            self._file.flush()
+
+    def record(self, move):
+        self._write(encode_move(move))
+
+    def undo(self):
+        self._write(bytes((UNDO,)))
+
+    def redo(self):
+        self._write(bytes((REDO,)))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Replay:
+    # Streams a recording: `seed` is read up front, iterating yields engine
+    # moves and the UNDO / REDO markers in order.
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError("truncated replay header")
+        magic, version, _, _, self.seed = _HEADER.unpack(header)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"not a version {REPLAY_VERSION} replay")
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            pending = None  # first byte of a move still waiting for its count
+            while True:
+                chunk = f.read(_CHUNK)
+                if not chunk:
+                    break
+                for b in chunk:
+                    if pending is not None:
+                        yield pending | b << 8
+                        pending = None
+                    elif b == UNDO or b == REDO:
+                        yield b
+                    elif _needs_count(b >> 4, b & 0xF):
+                        pending = (b >> 4) | (b & 0xF) << 4
+                    else:
+                        yield (b >> 4) | (b & 0xF) << 4 | 1 << 8
+            # A count byte cut off by a crash just loses that last move
+
+
+def apply_event(state, event, check=True):
+    # Apply one replay event; returns the engine move it performed (or None
+    # for an undo/redo with nothing to do)
+    if event == UNDO:
+        return state.undo()
+    if event == REDO:
+        return state.redo()
+    state.apply(event, check=check)
+    return event
+
+
+def replay(path, check=True):
+    # Play a recording headlessly; returns (Replay, final Klondike state)
+    rec = Replay(path)
+    state = Klondike(engine.seeded_deck(rec.seed))
+    for event in rec:
+        apply_event(state, event, check)
+    return rec, state
+
+
+# -------------------- Command line --------------------
+def add_parser(subparsers):
+    p = subparsers.add_parser("replay", help="play back recorded games")
+    p.add_argument("files", nargs="+", help=f"{REPLAY_SUFFIX} recordings, shown one after another")
+    p.add_argument("--headless", action="store_true", help="verify and summarize instead of showing the table")
+    p.add_argument("--speed", type=int, default=300, help="milliseconds per move on the table")
+    return p
+
+
+def main(args):
+    # Headless: one 'file seed moves foundation_cards won' line per recording
+    status = 0
+    for path in args.files:
+        try:
+            rec, state = replay(path)
+        except OSError as e:
+            print(e)
+            status = 1
+            continue
+        except ValueError as e:
+            print(f"{path}: {e}")
+            status = 1
+            continue
+        up = sum(len(state.piles[f]) for f in engine.FOUNDATIONS)
+        print(f"{path} seed={rec.seed} moves={len(state.history)} foundation_cards={up} won={int(up == 52)}")
+    return status
@@ -0,0 +1,131 @@
+# On-disk cache of card images that were already decoded, converted to RGBA
+# and resized, so warm starts skip PNG decoding and resampling entirely.
+#
+# A blob is named after (source path, mtime, file size, target size, filter),
+# so an edited source simply misses.  index.json remembers which blob each
+# (source, size, filter) slot currently points at; replacing a slot deletes
+# the blob it pointed at before, and prune() drops slots whose source is gone
+# plus any orphaned blobs.
+import hashlib
+import json
+import os
+import struct
+import threading
+
+_HEADER = struct.Struct("<4sII")  # magic, width, height
+_MAGIC = b"RGBA"
+
+
+def cache_dir():
+    base = os.environ.get("SOLITAIRE_CACHE_DIR")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        base = os.path.join(xdg, "solitaire-tk")
+    return base
+
+
+class ResizedImageCache:
+    def __init__(self, root=None):
+        self.dir = os.path.join(root or cache_dir(), "images")
+        self.index_path = os.path.join(self.dir, "index.json")
+        self.index = None  # slot -> blob name, loaded on first write
+        self.dirty = False
+        self.lock = threading.Lock()  # put() may run on loader threads
+
+    @staticmethod
+    def _slot(path, w, h, resample):
+        return f"{os.path.abspath(path)}|{w}x{h}|{resample}"
+
+    def _blob_name(self, path, w, h, resample):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = f"{self._slot(path, w, h, resample)}|{st.st_mtime_ns}|{st.st_size}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".rgba"
+
+    def _load_index(self):
+        if self.index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+        return self.index
+
+    def get(self, path, w, h, resample):
+        # Raw RGBA bytes (w*h*4) or None on a miss
+        name = self._blob_name(path, w, h, resample)
+        if name is None:
+            return None
+        try:
+            with open(os.path.join(self.dir, name), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != _HEADER.size + w * h * 4 or _HEADER.unpack_from(data) != (_MAGIC, w, h):
+            return None
+        return data[_HEADER.size:]
+
+    def put(self, path, w, h, resample, data):
+        name = self._blob_name(path, w, h, resample)
+        if name is None or len(data) != w * h * 4:
+            return
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            tmp = os.path.join(self.dir, name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, w, h))
+                f.write(data)
+            os.replace(tmp, os.path.join(self.dir, name))
+        except OSError:
+            return
+        with self.lock:
+            index = self._load_index()
+            slot = self._slot(path, w, h, resample)
+            old = index.get(slot)
+            if old != name:
+                if old:
+                    self._remove(old)
+                index[slot] = name
+                self.dirty = True
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.dir, name))
+        except OSError:
+            pass
+
+    def prune(self):
+        index = self._load_index()
+        for slot, name in list(index.items()):
+            if not os.path.exists(slot.rsplit("|", 2)[0]):
+                self._remove(name)
+                del index[slot]
+                self.dirty = True
+        live = set(index.values())
+        try:
+            names = os.listdir(self.dir)
+        except OSError:
+            names = []
+        for name in names:
+            if name.endswith((".rgba", ".tmp")) and name not in live:
+                self._remove(name)
+
+    def flush(self):
+        # Persist the index (and tidy up) only if something was written
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.dirty:
+            return
+        self.prune()
+        try:
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            return
+        self.dirty = False
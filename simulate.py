@@ -0,0 +1,201 @@
+# Batch simulator: plays seeded deals with an automatic policy over a process
+# pool and reports throughput and win rates.  Only engine.py is used, never Tk.
+#
+#   python main.py simulate -n 100000 --policy greedy --workers 32
+#
+# A policy factory returns a fresh per-game callable `policy(state, rng)` that
+# picks the next engine move (or None to give up).  Register new ones with
+# @register_policy("name") or pass "package.module:factory" on the command line.
+import importlib
+import os
+import random
+import sys
+import time
+
+import engine
+from engine import FOUNDATIONS, STOCK, TABLEAUS, WASTE, Klondike
+
+POLICIES = {}
+
+
+def register_policy(name):
+    def deco(factory):
+        POLICIES[name] = factory
+        return factory
+    return deco
+
+
+def resolve_policy(name):
+    if name in POLICIES:
+        return POLICIES[name]
+    if ":" in name:
+        module, attr = name.split(":", 1)
+        return getattr(importlib.import_module(module), attr)
+    raise ValueError(f"unknown policy {name!r} (known: {', '.join(sorted(POLICIES))})")
+
+
+@register_policy("random")
+def random_policy():
+    def policy(state, rng):
+        moves = state.legal_moves()
+        return rng.choice(moves) if moves else None
+    return policy
+
+
+@register_policy("greedy")
+def greedy_policy():
+    # Foundation moves, then moves that turn a card up or empty a column, then
+    # waste plays, then the stock.  Gives up after a full pass over the talon
+    # without any other move.
+    idle = [0]
+
+    def policy(state, rng):
+        piles = state.piles
+        down = state.down
+        best = None
+        for m in state.legal_moves():
+            src, dst, n = m & 0xF, (m >> 4) & 0xF, (m >> 8) & 0x3F
+            if src == STOCK or dst == STOCK:
+                score = 0
+            elif dst in FOUNDATIONS:
+                score = 4
+            elif src in TABLEAUS:
+                rest = len(piles[src]) - n
+                if rest and rest == down[src]:
+                    score = 3  # turns a card up
+                elif not rest and piles[src][0] % 13 != 12:
+                    score = 2  # empties a column
+                else:
+                    continue
+            elif src == WASTE:
+                score = 1
+            else:
+                continue
+            if best is None or score > best[0]:
+                best = (score, m)
+        if best is None:
+            return None
+        if best[0] == 0:
+            idle[0] += 1
+            if idle[0] > len(piles[STOCK]) + len(piles[WASTE]) + 1:
+                return None
+        else:
+            idle[0] = 0
+        return best[1]
+    return policy
+
+
+@register_policy("solver")
+def solver_policy(max_nodes=200_000):
+    import solver
+    plan = []
+
+    def policy(state, rng):
+        if not state.history:
+            result = solver.solve(state, max_nodes=max_nodes)
+            plan[:] = reversed(result.moves)
+        return plan.pop() if plan else None
+    return policy
+
+
+def play_deal(seed, policy_name="greedy", max_moves=2000):
+    # Returns (seed, won, moves played, cards on foundations)
+    state = Klondike(engine.seeded_deck(seed))
+    policy = resolve_policy(policy_name)()
+    rng = random.Random(seed)
+    moves = 0
+    while moves < max_moves and not state.is_won():
+        m = policy(state, rng)
+        if m is None:
+            break
+        state.apply(m)
+        moves += 1
+    up = sum(len(state.piles[f]) for f in FOUNDATIONS)
+    return seed, up == 52, moves, up
+
+
+def _play_batch(task):
+    start, count, policy_name, max_moves = task
+    return [play_deal(seed, policy_name, max_moves) for seed in range(start, start + count)]
+
+
+def run(games, first_seed=0, policy_name="greedy", workers=None, batch=64, max_moves=2000, on_result=None):
+    # Streams results to on_result(seed, won, moves, up) as batches finish and
+    # returns a summary dict.  workers=1 runs in-process (handy for profiling).
+    resolve_policy(policy_name)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(s, min(batch, first_seed + games - s), policy_name, max_moves)
+             for s in range(first_seed, first_seed + games, batch)]
+    wins = played = moves_total = 0
+    start = time.perf_counter()
+    if workers == 1:
+        batches = map(_play_batch, tasks)
+        pool = None
+    else:
+        import multiprocessing  # only the parallel path pays for the import
+        pool = multiprocessing.Pool(workers)
+        batches = pool.imap_unordered(_play_batch, tasks)
+    try:
+        for results in batches:
+            for seed, won, moves, up in results:
+                played += 1
+                wins += won
+                moves_total += moves
+                if on_result is not None:
+                    on_result(seed, won, moves, up)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "games": played,
+        "wins": wins,
+        "win_rate": wins / played if played else 0.0,
+        "avg_moves": moves_total / played if played else 0.0,
+        "elapsed": elapsed,
+        "games_per_sec": played / elapsed if elapsed else 0.0,
+        "policy": policy_name,
+        "workers": workers,
+    }
+
+
+# -------------------- Command line --------------------
+def add_parser(subparsers):
+    p = subparsers.add_parser("simulate", help="play seeded deals headlessly and report win rates")
+    p.add_argument("-n", "--games", type=int, default=10000, help="number of deals to play")
+    p.add_argument("--seed", type=int, default=0, help="first deal number")
+    p.add_argument("--policy", default="greedy", help=f"{', '.join(sorted(POLICIES))} or module:factory")
+    p.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    p.add_argument("--batch", type=int, default=64, help="deals per worker task")
+    p.add_argument("--max-moves", type=int, default=2000, help="give up a deal after this many moves")
+    p.add_argument("--out", help="write one 'seed,won,moves,foundation_cards' line per deal")
+    p.set_defaults(func=main)
+    return p
+
+
+def main(args):
+    out = open(args.out, "w") if args.out else None
+    progress = {"n": 0, "wins": 0, "last": time.perf_counter(), "start": time.perf_counter()}
+
+    def on_result(seed, won, moves, up):
+        progress["n"] += 1
+        progress["wins"] += won
+        if out is not None:
+            out.write(f"{seed},{int(won)},{moves},{up}\n")
+        now = time.perf_counter()
+        if now - progress["last"] >= 2.0:
+            progress["last"] = now
+            n = progress["n"]
+            print(f"{n}/{args.games} deals  {n / (now - progress['start']):.0f} games/s  "
+                  f"win rate {progress['wins'] / n:.2%}", file=sys.stderr)
+
+    try:
+        summary = run(args.games, args.seed, args.policy, args.workers, args.batch, args.max_moves, on_result)
+    finally:
+        if out is not None:
+            out.close()
+    print(f"policy={summary['policy']} workers={summary['workers']} games={summary['games']} "
+          f"wins={summary['wins']} win_rate={summary['win_rate']:.2%} avg_moves={summary['avg_moves']:.1f} "
+          f"elapsed={summary['elapsed']:.2f}s throughput={summary['games_per_sec']:.0f} games/s")
+    return 0
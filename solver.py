@@ -0,0 +1,319 @@
+# Depth-first Klondike solver (draw 1, unlimited recycles) on top of engine.py.
+#
+# States are identified by an incrementally maintained Zobrist hash and kept in
+# a bounded two-generation transposition table.  With unlimited recycles every
+# stock/waste card can be reached by dealing, so the talon is hashed as one
+# cyclic sequence (waste, then stock in dealing order) regardless of where the
+# stock/waste split is, and it is searched with macro moves ("deal until card X
+# is on the waste, then play it").  Cards that can never be needed on the
+# tableau again are played to the foundations without branching, and
+# tableau-to-tableau moves are only tried when they turn a card up, empty a
+# column or free a card for the foundations.  That pruning is what makes the
+# search fast; it also means "unsolvable" is a (very good) heuristic verdict.
+import random
+import time
+
+import engine
+from engine import FOUNDATIONS, NUM_PILES, STOCK, TABLEAUS, WASTE, Klondike
+
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+GAVE_UP = "gave_up"  # node or time budget ran out
+
+_KEY_RNG = random.Random(0x5EED)
+# _CARD_KEYS[pile][position][card], _TALON_KEYS[talon position][card] and
+# _DOWN_KEYS[pile][face-down count]
+_CARD_KEYS = [[[_KEY_RNG.getrandbits(64) for _ in range(52)] for _ in range(20)] for _ in range(NUM_PILES)]
+_TALON_KEYS = [[_KEY_RNG.getrandbits(64) for _ in range(52)] for _ in range(24)]
+_DOWN_KEYS = [[_KEY_RNG.getrandbits(64) for _ in range(8)] for _ in range(NUM_PILES)]
+
+
+def _recycle(count):
+    return WASTE | STOCK << 4 | count << 8
+
+
+def zobrist(state):
+    piles = state.piles
+    h = 0
+    for i, c in enumerate(piles[WASTE] + piles[STOCK][::-1]):
+        h ^= _TALON_KEYS[i][c]
+    for p in FOUNDATIONS + TABLEAUS:
+        keys = _CARD_KEYS[p]
+        for i, c in enumerate(piles[p]):
+            h ^= keys[i][c]
+        h ^= _DOWN_KEYS[p][state.down[p]]
+    return h
+
+
+class TranspositionTable:
+    # Two generations of hashes: when the young one fills up the old one is
+    # dropped, so memory stays bounded at ~max_entries while recent states
+    # (the ones most likely to be revisited) survive.
+    def __init__(self, max_entries=1 << 20):
+        self.half = max(1, max_entries // 2)
+        self.young = set()
+        self.old = set()
+
+    def __contains__(self, h):
+        return h in self.young or h in self.old
+
+    def add(self, h):
+        if len(self.young) >= self.half:
+            self.old = self.young
+            self.young = set()
+        self.young.add(h)
+
+    def __len__(self):
+        return len(self.young) + len(self.old)
+
+
+class SolveResult:
+    __slots__ = ("status", "moves", "nodes", "elapsed")
+
+    def __init__(self, status, moves, nodes, elapsed):
+        self.status = status
+        self.moves = moves  # engine moves from the initial deal, empty unless solved
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def solved(self):
+        return self.status == SOLVED
+
+    def __repr__(self):
+        return f"SolveResult({self.status}, moves={len(self.moves)}, nodes={self.nodes}, {self.elapsed:.3f}s)"
+
+
+class Solver:
+    def __init__(self, state, max_nodes=200_000, time_limit=None, tt_size=1 << 20):
+        # Accept a Klondike state or a 52-card deck order
+        if not isinstance(state, Klondike):
+            state = Klondike(state)
+        self.state = state.copy()
+        self.state.history = engine.MoveLog()
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.tt = TranspositionTable(tt_size)
+        self.nodes = 0
+
+    # -------------------- Hashing --------------------
+    def _play(self, h, move):
+        # Apply `move` and return the updated hash
+        state = self.state
+        piles = state.piles
+        src, dst, n = move & 0xF, (move >> 4) & 0xF, (move >> 8) & 0x3F
+        if src == STOCK or dst == STOCK:
+            # Dealing and recycling only move the split, the talon order stays
+            state.apply(move, check=False)
+            return h
+        sp = piles[src]
+        ls = len(sp)
+        dkeys = _CARD_KEYS[dst]
+        ld = len(piles[dst])
+        if src == WASTE:
+            c = sp[-1]
+            h ^= _TALON_KEYS[ls - 1][c] ^ dkeys[ld][c]
+            # Every stock card moves one place up the talon sequence
+            stock = piles[STOCK]
+            pos = ls + len(stock) - 1
+            for c in stock:
+                h ^= _TALON_KEYS[pos][c] ^ _TALON_KEYS[pos - 1][c]
+                pos -= 1
+        else:
+            skeys = _CARD_KEYS[src]
+            for k in range(n):
+                c = sp[ls - n + k]
+                h ^= skeys[ls - n + k][c] ^ dkeys[ld + k][c]
+        if state.apply(move, check=False):
+            d = state.down[src]
+            h ^= _DOWN_KEYS[src][d + 1] ^ _DOWN_KEYS[src][d]
+        return h
+
+    # -------------------- Move selection --------------------
+    def _foundation_heights(self):
+        heights = [0, 0, 0, 0]
+        piles = self.state.piles
+        for f in FOUNDATIONS:
+            pile = piles[f]
+            if pile:
+                heights[pile[-1] // 13] = len(pile)
+        return heights
+
+    def _talon_macro(self, i, dst):
+        # Engine moves that deal talon card i onto the waste and play it to dst
+        piles = self.state.piles
+        lw, ls = len(piles[WASTE]), len(piles[STOCK])
+        if i >= lw - 1:
+            seq = [engine.DEAL] * (i - lw + 1)
+        else:
+            seq = [engine.DEAL] * ls + [_recycle(lw + ls)] + [engine.DEAL] * (i + 1)
+        seq.append(WASTE | dst << 4 | 1 << 8)
+        return seq
+
+    def _auto_moves(self, h):
+        # Play every card that is safe to put up; returns (hash, engine moves applied)
+        state = self.state
+        piles = state.piles
+        heights = self._foundation_heights()
+        count = 0
+        progress = True
+        while progress:
+            progress = False
+            talon = piles[WASTE] + piles[STOCK][::-1]
+            sources = [(t, piles[t][-1]) for t in TABLEAUS if piles[t]]
+            sources += [(-1 - i, c) for i, c in enumerate(talon)]
+            for src, c in sources:
+                suit, v = c // 13, c % 13 + 1
+                if heights[suit] != v - 1:
+                    continue
+                # Safe when no opposite-coloured card of rank v-1 can still want it
+                if v > 2 and (heights[(suit + 1) % 4] < v - 1 or heights[(suit + 3) % 4] < v - 1):
+                    continue
+                for f in FOUNDATIONS:
+                    if state.fits_foundation(c, f):
+                        break
+                seq = [src | f << 4 | 1 << 8] if src >= 0 else self._talon_macro(-1 - src, f)
+                for m in seq:
+                    h = self._play(h, m)
+                heights[suit] = v
+                count += len(seq)
+                progress = True
+                break
+        return h, count
+
+    def _moves(self):
+        # Candidate moves, each a list of engine moves, most promising first
+        state = self.state
+        piles = state.piles
+        down = state.down
+        fits_tableau = state.fits_tableau
+        fits_foundation = state.fits_foundation
+        up_moves = []
+        reveal = []
+        other = []
+        talon_moves = []
+        back_down = []
+        empty = None
+        for t in TABLEAUS:
+            if not piles[t]:
+                empty = t
+                break
+        for src in TABLEAUS:
+            pile = piles[src]
+            if not pile:
+                continue
+            for f in FOUNDATIONS:
+                if fits_foundation(pile[-1], f):
+                    up_moves.append([src | f << 4 | 1 << 8])
+                    break
+        talon = piles[WASTE] + piles[STOCK][::-1]
+        # Cards that could still be placed somewhere: talon plus face-up tableau
+        movable = set(talon)
+        spare_king = any(c % 13 == 12 for c in talon)
+        for t in TABLEAUS:
+            pile = piles[t]
+            movable.update(pile[down[t]:])
+            spare_king = spare_king or any(c % 13 == 12 for c in pile[1:])
+        for src in TABLEAUS:
+            pile = piles[src]
+            ls = len(pile)
+            if not ls:
+                continue
+            d = down[src]
+            faceup = ls - d
+            for n in range(1, faceup + 1):
+                head = pile[-n]
+                if n == faceup:
+                    # Moving a king that already sits at the bottom is pointless,
+                    # and so is emptying a column no king can move into
+                    if d == 0 and (head % 13 == 12 or not spare_king):
+                        continue
+                else:
+                    # Splitting a run only helps if it frees a card for the foundations
+                    under = pile[-n - 1]
+                    if not any(fits_foundation(under, f) for f in FOUNDATIONS):
+                        continue
+                bucket = reveal if n == faceup and d else other
+                for dst in TABLEAUS:
+                    if dst != src and piles[dst] and fits_tableau(head, dst):
+                        bucket.append([src | dst << 4 | n << 8])
+                if empty is not None and head % 13 == 12:
+                    bucket.append([src | empty << 4 | n << 8])
+        # Every talon card is reachable by dealing (and recycling if needed)
+        for i, c in enumerate(talon):
+            for f in FOUNDATIONS:
+                if fits_foundation(c, f):
+                    up_moves.append(self._talon_macro(i, f))
+                    break
+            for dst in TABLEAUS:
+                if piles[dst] and fits_tableau(c, dst):
+                    talon_moves.append(self._talon_macro(i, dst))
+            if empty is not None and c % 13 == 12:
+                talon_moves.append(self._talon_macro(i, empty))
+        # Taking a card back down from the foundations is the last resort, and
+        # only worth it if an opposite-coloured card one lower can follow it
+        for f in FOUNDATIONS:
+            pile = piles[f]
+            if pile and pile[-1] % 13 > 0:
+                c = pile[-1]
+                lower = c % 13 - 1
+                suit = c // 13
+                if lower + (suit + 1) % 4 * 13 not in movable and lower + (suit + 3) % 4 * 13 not in movable:
+                    continue
+                for dst in TABLEAUS:
+                    if piles[dst] and fits_tableau(c, dst):
+                        back_down.append([f | dst << 4 | 1 << 8])
+        # Prefer revealing from the deepest column first
+        reveal.sort(key=lambda seq: -down[seq[0] & 0xF])
+        return up_moves + reveal + talon_moves + other + back_down
+
+    # -------------------- Search --------------------
+    def solve(self):
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit else None
+        state = self.state
+        tt = self.tt
+
+        def result(status):
+            moves = list(state.history) if status == SOLVED else []
+            return SolveResult(status, [m & ~engine.FLIP_BIT for m in moves], self.nodes,
+                               time.perf_counter() - start)
+
+        h, _ = self._auto_moves(zobrist(state))
+        if state.is_won():
+            return result(SOLVED)
+        tt.add(h)
+        # frame: [candidate move lists, next index, engine moves to undo on pop, hash]
+        frames = [[self._moves(), 0, 0, h]]
+        while frames:
+            frame = frames[-1]
+            moves, i = frame[0], frame[1]
+            if i == len(moves):
+                frames.pop()
+                for _ in range(frame[2]):
+                    state.undo()
+                continue
+            frame[1] = i + 1
+            self.nodes += 1
+            if self.nodes >= self.max_nodes:
+                return result(GAVE_UP)
+            if deadline is not None and not self.nodes & 1023 and time.perf_counter() > deadline:
+                return result(GAVE_UP)
+            h = frame[3]
+            for m in moves[i]:
+                h = self._play(h, m)
+            h, auto = self._auto_moves(h)
+            applied = len(moves[i]) + auto
+            if state.is_won():
+                return result(SOLVED)
+            if h in tt:
+                for _ in range(applied):
+                    state.undo()
+                continue
+            tt.add(h)
+            frames.append([self._moves(), 0, applied, h])
+        return result(UNSOLVABLE)
+
+
+def solve(state, max_nodes=200_000, time_limit=None, tt_size=1 << 20):
+    return Solver(state, max_nodes=max_nodes, time_limit=time_limit, tt_size=tt_size).solve()
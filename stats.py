@@ -0,0 +1,242 @@
+# Game statistics in SQLite.
+#
+# record() only queues a row; a writer thread owns the write connection and
+# commits whatever has queued up at most once a second (or every 256 games),
+# one transaction per flush, with the database in WAL mode so readers never
+# wait.  Every insert also updates a per-player summary row in the same
+# transaction, so win rate, streaks and best time are single-row reads however
+# many games are stored; best-time and history lists are served by indexes.
+import getpass
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+FLUSH_SECONDS = 1.0
+FLUSH_BATCH = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    moves INTEGER NOT NULL,
+    won INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_start ON games (player, started);
+CREATE INDEX IF NOT EXISTS games_by_time ON games (player, won, duration);
+CREATE TABLE IF NOT EXISTS summary (
+    player TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL,
+    best_time REAL,
+    total_time REAL NOT NULL
+);
+"""
+
+_STOP = object()
+
+
+def data_dir():
+    base = os.environ.get("SOLITAIRE_DATA_DIR")
+    if not base:
+        xdg = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        base = os.path.join(xdg, "solitaire-tk")
+    return base
+
+
+def _to_sql(seed):
+    # Deal numbers go up to 2**64-1 but SQLite integers are signed 64-bit:
+    # store the top half as negatives, two's complement style
+    return seed - (1 << 64) if seed >= 1 << 63 else seed
+
+
+def _from_sql(seed):
+    return seed % (1 << 64)
+
+
+def _fold_summary(conn, player, rows):
+    # Add one player's new games, in play order, to their summary row
+    row = conn.execute("SELECT games, wins, streak, best_streak, best_time, total_time FROM summary "
+                       "WHERE player = ?", (player,)).fetchone()
+    games, wins, streak, best_streak, best_time, total_time = row or (0, 0, 0, 0, None, 0.0)
+    for r in rows:
+        games += 1
+        total_time += r["duration"]
+        if r["won"]:
+            wins += 1
+            streak += 1
+            best_streak = max(best_streak, streak)
+            if best_time is None or r["duration"] < best_time:
+                best_time = r["duration"]
+        else:
+            streak = 0
+    conn.execute("INSERT OR REPLACE INTO summary (player, games, wins, streak, best_streak, best_time, total_time) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?)", (player, games, wins, streak, best_streak, best_time, total_time))
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, never corrupt
+    return conn
+
+
+class StatsStore:
+    def __init__(self, path=None, player=None):
+        self.path = path or os.path.join(data_dir(), "stats.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.player = player or getpass.getuser()
+        self._queue = queue.Queue()
+        self._reader = None  # opened on first query, Tk thread only
+        # Opening the database and creating the schema happen on the writer
+        # thread too, so a new store costs the Tk thread nothing
+        self._thread = threading.Thread(target=self._writer, name="solitaire-stats", daemon=True)
+        self._thread.start()
+
+    # -------------------- Writing --------------------
+    def record(self, seed, started, duration, moves, won):
+        self._queue.put({"player": self.player, "seed": _to_sql(seed), "started": started,
+                         "duration": duration, "moves": moves, "won": int(bool(won))})
+
+    def flush(self, timeout=5.0):
+        # Wait until everything recorded so far is committed
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(5.0)
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _writer(self):
+        try:
+            conn = _connect(self.path)
+            conn.executescript(_SCHEMA)
+        except Exception:
+            conn = None  # keep draining the queue so flush() never hangs
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + FLUSH_SECONDS
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or waiters or len(batch) >= FLUSH_BATCH:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            try:
+                if batch and conn is not None:
+                    self._commit(conn, batch)
+            finally:
+                for w in waiters:
+                    w.set()
+        if conn is not None:
+            conn.close()
+
+    @staticmethod
+    def _commit(conn, rows):
+        try:
+            with conn:
+                conn.executemany("INSERT INTO games (player, seed, started, duration, moves, won) "
+                                 "VALUES (:player, :seed, :started, :duration, :moves, :won)", rows)
+                for player in {r["player"] for r in rows}:
+                    _fold_summary(conn, player, [r for r in rows if r["player"] == player])
+        except Exception:
+            # Statistics must never take the game down: a bad batch is lost,
+            # the writer thread and later games are not
+            pass
+
+    # -------------------- Queries --------------------
+    def _conn(self):
+        if self._reader is None:
+            self.flush()  # the writer has created the schema by then
+            self._reader = _connect(self.path)
+        return self._reader
+
+    def summary(self):
+        row = self._conn().execute(
+            "SELECT games, wins, streak, best_streak, best_time, total_time FROM summary WHERE player = ?",
+            (self.player,)).fetchone()
+        games, wins, streak, best_streak, best_time, total_time = row or (0, 0, 0, 0, None, 0.0)
+        return {"games": games, "wins": wins, "win_rate": wins / games if games else 0.0, "streak": streak,
+                "best_streak": best_streak, "best_time": best_time,
+                "average_time": total_time / games if games else None}
+
+    def best_times(self, limit=10):
+        # [(duration, moves, seed, started)] of the fastest wins
+        rows = self._conn().execute(
+            "SELECT duration, moves, seed, started FROM games WHERE player = ? AND won = 1 "
+            "ORDER BY duration LIMIT ?", (self.player, limit)).fetchall()
+        return [(d, m, _from_sql(seed), started) for d, m, seed, started in rows]
+
+    def recent(self, limit=20):
+        # [(started, duration, moves, won, seed)], newest first
+        rows = self._conn().execute(
+            "SELECT started, duration, moves, won, seed FROM games WHERE player = ? "
+            "ORDER BY started DESC LIMIT ?", (self.player, limit)).fetchall()
+        return [(started, d, m, won, _from_sql(seed)) for started, d, m, won, seed in rows]
+
+
+def _format_time(seconds):
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def describe(store):
+    # Human-readable summary for the stats dialog
+    try:
+        s = store.summary()
+        best = store.best_times(5)
+    except sqlite3.Error as e:
+        return f"Statistics are unavailable: {e}"
+    lines = [f"Games played: {s['games']}",
+             f"Won: {s['wins']} ({s['win_rate']:.0%})",
+             f"Current streak: {s['streak']}  Best streak: {s['best_streak']}",
+             f"Best time: {_format_time(s['best_time'])}  Average: {_format_time(s['average_time'])}"]
+    if best:
+        lines.append("")
+        lines.append("Fastest wins:")
+        lines += [f"  {_format_time(d)}  {m} moves  deal #{seed}" for d, m, seed, _ in best]
+    return "\n".join(lines)
+
+
+# -------------------- Command line --------------------
+def add_parser(subparsers):
+    p = subparsers.add_parser("stats", help="show game statistics")
+    p.add_argument("--recent", type=int, default=0, help="also list this many recent games")
+    p.set_defaults(func=main)
+    return p
+
+
+def main(args):
+    store = StatsStore()
+    try:
+        print(describe(store))
+        if args.recent:
+            print("\nRecent games:")
+            for started, duration, moves, won, seed in store.recent(args.recent):
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(started))
+                print(f"  {when}  {'won ' if won else 'lost'}  {_format_time(duration)}  {moves} moves  deal #{seed}")
+    finally:
+        store.close()
+    return 0
@@ -0,0 +1,40 @@
+import pytest
+
+import atlas
+
+
+def cells():
+    return {name: (4, 3, bytes([i]) * 48) for i, name in enumerate(["back", "H:A", "S:10"])}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "deck.atlas")
+    atlas.write_atlas(path, cells())
+    assert atlas.is_atlas(path)
+    a = atlas.Atlas(path)
+    try:
+        assert sorted(a.names()) == sorted(cells())
+        for name, (w, h, data) in cells().items():
+            cw, ch, buf = a.cell(name)
+            assert (cw, ch, bytes(buf)) == (w, h, data)
+        assert a.cell("D:K") is None
+    finally:
+        a.close()
+
+
+def test_partly_written_file_is_a_value_error(tmp_path):
+    # A deck being rewritten under a watcher can be cut anywhere
+    path = str(tmp_path / "deck.atlas")
+    atlas.write_atlas(path, cells())
+    with open(path, "rb") as f:
+        data = f.read()
+    for size in range(len(data)):
+        with open(path, "wb") as f:
+            f.write(data[:size])
+        with pytest.raises(ValueError):
+            atlas.Atlas(path)
+
+
+def test_rejects_mixed_sizes(tmp_path):
+    with pytest.raises(ValueError):
+        atlas.write_atlas(str(tmp_path / "bad.atlas"), {"back": (1, 1, bytes(4)), "H:A": (2, 1, bytes(8))})
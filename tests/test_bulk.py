@@ -0,0 +1,65 @@
+import itertools
+
+import pytest
+
+import bulk
+import engine
+from engine import STOCK, TABLEAUS, Klondike
+
+np = pytest.importorskip("numpy")
+
+
+def plain_features(deck):
+    # The FEATURES definitions, one deal at a time, on the engine's own layout
+    state = Klondike(deck)
+    piles, down = state.piles, state.down
+    value = engine.card_value
+
+    def fits(card, onto):
+        return value(onto) == value(card) + 1 and engine.card_is_red(onto) != engine.card_is_red(card)
+
+    tableau = [(piles[t], down[t]) for t in TABLEAUS]
+    tops = [pile[-1] for pile, _ in tableau]
+    stock = piles[STOCK][::-1]  # the order the stock deals in, top first
+    runs = [len(list(g)) for _, g in itertools.groupby(engine.card_is_red(c) for c in stock)]
+    return {
+        "aces_up": sum(value(c) == 1 for c in tops),
+        "aces_buried": sum(value(c) == 1 for pile, d in tableau for c in pile[:d]),
+        "ace_depth": sum(len(pile) - 1 - i for pile, _ in tableau for i, c in enumerate(pile) if value(c) == 1),
+        "aces_in_stock": sum(value(c) == 1 for c in stock),
+        "kings_buried": sum(value(c) == 13 for pile, d in tableau for c in pile[1:d]),
+        "kings_at_bottom": sum(value(pile[0]) == 13 for pile, _ in tableau),
+        "first_moves": sum(value(c) == 1 or any(fits(c, o) for o in tops) for c in tops),
+        "stock_color_runs": len(runs),
+        "stock_longest_run": max(runs),
+    }
+
+
+def test_numbered_deals_are_the_games_deals():
+    deals = bulk.numbered_deals(40, 5)
+    assert [list(d) for d in deals] == [engine.seeded_deck(40 + i) for i in range(5)]
+
+
+def test_features_match_plain_python():
+    deals = bulk.numbered_deals(0, 300)
+    feats = bulk.features(deals, chunk=64)  # several chunks, the last one partial
+    assert set(feats) == set(bulk.FEATURES)
+    for i, deck in enumerate(deals):
+        expected = plain_features(list(deck))
+        assert {name: int(feats[name][i]) for name in bulk.FEATURES} == expected, f"deal {i}"
+
+
+def test_tableau_columns():
+    deals = bulk.numbered_deals(7, 3)
+    cols = bulk.tableau(deals)
+    for deck, layout in zip(deals, cols):
+        state = Klondike(list(deck))
+        for c, t in enumerate(TABLEAUS):
+            assert list(layout[c, :c + 1]) == list(state.piles[t])
+            assert (layout[c, c + 1:] == bulk.NO_CARD).all()
+
+
+def test_random_deals_are_reproducible_permutations():
+    a = bulk.random_deals(50, seed=3)
+    assert (a == bulk.random_deals(50, seed=3)).all()
+    assert (np.sort(a, axis=1) == np.arange(52)).all()
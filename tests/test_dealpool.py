@@ -0,0 +1,59 @@
+import pytest
+
+import dealpool
+
+
+def test_add_take_and_reopen(tmp_path):
+    path = str(tmp_path / "dealpool.bin")
+    store = dealpool.SeedStore(path)
+    first = store.next_seed
+    store.add(11, 120, 500)
+    store.add(12, 90, 70_000)
+    store.skip_to(first + 20)
+    assert store.available() == 2
+    deal = store.take()
+    assert (deal.seed, deal.moves, deal.nodes) == (11, 120, 500)
+    store.close()
+
+    store = dealpool.SeedStore(path)
+    try:
+        assert store.next_seed == first + 20
+        assert store.available() == 1
+        assert store.take().seed == 12
+        assert store.take() is None
+    finally:
+        store.close()
+
+
+def test_skip_to_never_goes_back(tmp_path):
+    store = dealpool.SeedStore(str(tmp_path / "dealpool.bin"))
+    try:
+        store.skip_to(store.next_seed + 5)
+        mark = store.next_seed
+        store.skip_to(mark - 3)
+        assert store.next_seed == mark
+    finally:
+        store.close()
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "dealpool.bin")
+    store = dealpool.SeedStore(path)
+    store.add(5, 100, 10)
+    store.close()
+    with open(path, "ab") as f:
+        f.write(b"\x07\x00\x00")  # a crash in the middle of the next add
+    store = dealpool.SeedStore(path)
+    try:
+        assert store.available() == 1
+        store.add(6, 101, 11)  # overwrites the torn bytes
+        assert [store.take().seed, store.take().seed] == [5, 6]
+    finally:
+        store.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "dealpool.bin"
+    path.write_bytes(b"NOPE" + bytes(20))
+    with pytest.raises(ValueError):
+        dealpool.SeedStore(str(path))
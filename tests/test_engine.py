@@ -0,0 +1,156 @@
+import random
+
+import pytest
+
+import engine
+from engine import FOUNDATIONS, STOCK, TABLEAUS, WASTE, Klondike, card_id, make_move
+
+
+def snapshot(state):
+    return [bytes(p) for p in state.piles], bytes(state.down)
+
+
+def empty_table():
+    state = Klondike()
+    state.down = bytearray(engine.NUM_PILES)
+    return state
+
+
+def put(state, p, *cards, down=0):
+    state.piles[p] = bytearray(card_id(s, r) for s, r in cards)
+    state.down[p] = down
+
+
+def test_deal_layout():
+    state = Klondike(engine.seeded_deck(1))
+    assert [len(state.piles[p]) for p in TABLEAUS] == [1, 2, 3, 4, 5, 6, 7]
+    assert [state.down[p] for p in TABLEAUS] == [0, 1, 2, 3, 4, 5, 6]
+    assert len(state.piles[STOCK]) == 24
+    assert sorted(b for p in state.piles for b in p) == list(range(52))
+
+
+def test_deal_rejects_bad_deck():
+    with pytest.raises(ValueError):
+        Klondike([0] * 52)
+
+
+def test_seeded_deck_is_reproducible():
+    assert engine.seeded_deck(42) == engine.seeded_deck(42)
+    assert engine.seeded_deck(42) != engine.seeded_deck(43)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_undo_redo_round_trip(seed):
+    rng = random.Random(seed)
+    state = Klondike(engine.seeded_deck(seed))
+    snapshots = [snapshot(state)]
+    for _ in range(300):
+        moves = state.legal_moves()
+        if not moves:
+            break
+        state.apply(rng.choice(moves))
+        snapshots.append(snapshot(state))
+    for expected in reversed(snapshots[:-1]):
+        assert state.undo() is not None
+        assert snapshot(state) == expected
+    assert state.undo() is None
+    for expected in snapshots[1:]:
+        assert state.redo() is not None
+        assert snapshot(state) == expected
+    assert state.redo() is None
+
+
+def test_new_move_clears_redo():
+    state = Klondike(engine.seeded_deck(3))
+    state.apply(engine.DEAL)
+    state.undo()
+    state.apply(engine.DEAL)
+    assert state.redo() is None
+
+
+def test_history_cap_bounds_undo():
+    state = Klondike(engine.seeded_deck(5), history_cap=64)
+    for _ in range(1000):
+        state.apply(state.legal_moves()[-1])
+    # the oldest records go in chunks, so the log may run a little over
+    assert 64 <= len(state.history) <= 64 + 16
+    assert state.history.dropped == 1000 - len(state.history)
+
+
+def test_legal_moves_are_legal():
+    rng = random.Random(7)
+    state = Klondike(engine.seeded_deck(7))
+    for _ in range(500):
+        moves = state.legal_moves()
+        assert all(state.is_legal(m) for m in moves)
+        state.apply(rng.choice(moves))
+
+
+def test_deal_and_recycle():
+    state = empty_table()
+    put(state, STOCK, ("S", "5"))
+    assert state.is_legal(engine.DEAL)
+    assert not state.is_legal(make_move(WASTE, STOCK, 0))
+    state.apply(engine.DEAL)
+    assert not state.is_legal(engine.DEAL)
+    assert not state.is_legal(make_move(WASTE, STOCK, 2))
+    assert state.is_legal(make_move(WASTE, STOCK, 1))
+    assert not state.is_legal(make_move(TABLEAUS[0], WASTE))
+
+
+def test_foundation_moves():
+    state = empty_table()
+    put(state, WASTE, ("H", "A"))
+    put(state, TABLEAUS[0], ("H", "2"))
+    put(state, TABLEAUS[1], ("D", "2"))
+    f = FOUNDATIONS[0]
+    assert not state.is_legal(make_move(TABLEAUS[0], f))  # only an ace starts a foundation
+    assert state.is_legal(make_move(WASTE, f))
+    state.apply(make_move(WASTE, f))
+    assert state.is_legal(make_move(TABLEAUS[0], f))
+    assert not state.is_legal(make_move(TABLEAUS[1], f))  # wrong suit
+    assert not state.is_legal(make_move(TABLEAUS[0], f, 2))  # one card at a time
+
+
+def test_tableau_moves():
+    state = empty_table()
+    put(state, TABLEAUS[0], ("C", "9"), ("H", "8"), ("S", "7"), down=1)
+    put(state, TABLEAUS[1], ("D", "9"))
+    put(state, TABLEAUS[2], ("S", "9"))
+    put(state, TABLEAUS[3], ("H", "K"))
+    put(state, WASTE, ("C", "8"))
+    assert state.is_legal(make_move(TABLEAUS[0], TABLEAUS[2], 2))  # red 8 on black 9
+    assert not state.is_legal(make_move(TABLEAUS[0], TABLEAUS[1], 2))  # same colour
+    assert not state.is_legal(make_move(TABLEAUS[0], TABLEAUS[2], 3))  # face-down card
+    assert state.is_legal(make_move(WASTE, TABLEAUS[1]))
+    assert not state.is_legal(make_move(WASTE, TABLEAUS[2]))
+    assert not state.is_legal(make_move(WASTE, TABLEAUS[1], 2))
+    assert state.is_legal(make_move(TABLEAUS[3], TABLEAUS[4]))  # king to an empty column
+    assert not state.is_legal(make_move(TABLEAUS[1], TABLEAUS[4]))
+
+
+def test_foundation_to_tableau():
+    state = empty_table()
+    put(state, FOUNDATIONS[0], ("H", "A"), ("H", "2"))
+    put(state, TABLEAUS[0], ("S", "3"))
+    assert state.is_legal(make_move(FOUNDATIONS[0], TABLEAUS[0]))
+    assert not state.is_legal(make_move(FOUNDATIONS[0], TABLEAUS[0], 2))
+
+
+def test_move_turns_up_card():
+    state = empty_table()
+    put(state, TABLEAUS[0], ("C", "4"), ("H", "A"), down=1)
+    assert state.apply(make_move(TABLEAUS[0], FOUNDATIONS[0]))
+    assert state.is_face_up(TABLEAUS[0], 0)
+    state.undo()
+    assert not state.is_face_up(TABLEAUS[0], 0)
+
+
+def test_finish_plays_out():
+    state = empty_table()
+    for i, suit in enumerate("DCHS"):
+        put(state, TABLEAUS[i], *((suit, r) for r in reversed(engine.RANK_NAMES)))
+    assert state.can_finish()
+    assert len(state.finish()) == 52
+    assert state.is_won()
+    assert not state.can_finish()
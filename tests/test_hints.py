@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+import engine
+import hints
+from engine import FOUNDATIONS, TABLEAUS, WASTE, Klondike, card_id, make_move
+
+
+def assert_matches_rebuilt(index):
+    fresh = hints.HintIndex(index.state)
+    assert index.where == fresh.where
+    assert index.pos == fresh.pos
+    assert index.needs == fresh.needs
+    assert index.wanted == fresh.wanted
+    assert index.moves() == fresh.moves()
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_incremental_index_matches_rebuild(seed):
+    rng = random.Random(seed)
+    state = Klondike(engine.seeded_deck(seed))
+    index = hints.HintIndex(state)
+    for _ in range(300):
+        roll = rng.random()
+        if roll < 0.15:
+            move = state.undo()
+        elif roll < 0.25:
+            move = state.redo()
+        else:
+            move = rng.choice(state.legal_moves())
+            state.apply(move)
+        if move is not None:
+            index.update(move)
+        assert_matches_rebuilt(index)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_hints_are_legal(seed):
+    rng = random.Random(seed)
+    state = Klondike(engine.seeded_deck(seed))
+    index = hints.HintIndex(state)
+    for _ in range(200):
+        assert all(state.is_legal(m) for m in index.moves())
+        move = rng.choice(state.legal_moves())
+        state.apply(move)
+        index.update(move)
+
+
+def test_turning_a_card_up_comes_first():
+    state = Klondike()
+    state.piles[TABLEAUS[0]] = bytearray([card_id("C", "4"), card_id("H", "A")])
+    state.down[TABLEAUS[0]] = 1
+    state.piles[WASTE] = bytearray([card_id("S", "A")])
+    index = hints.HintIndex(state)
+    assert index.best() == make_move(TABLEAUS[0], FOUNDATIONS[0])
+    assert not index.stuck()
+
+
+def test_stuck_without_useful_moves():
+    # Every other card is home; the 4 of clubs lies face down under 5..K
+    state = Klondike()
+    for f, suit in zip(FOUNDATIONS, "DHS"):
+        state.piles[f] = bytearray(card_id(suit, r) for r in engine.RANK_NAMES)
+    state.piles[FOUNDATIONS[3]] = bytearray(card_id("C", r) for r in "A23")
+    state.piles[TABLEAUS[0]] = bytearray(card_id("C", r) for r in engine.RANK_NAMES[3:])
+    state.down[TABLEAUS[0]] = 1
+    index = hints.HintIndex(state)
+    assert index.stuck()
+    assert index.best() is None
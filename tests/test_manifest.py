@@ -0,0 +1,35 @@
+import os
+
+import manifest
+
+
+def deck(tmp_path):
+    d = tmp_path / "deck"
+    d.mkdir()
+    for name in ("HA.png", "back.png"):
+        (d / name).write_bytes(b"")
+    return str(d)
+
+
+def test_round_trip(tmp_path):
+    image_dir = deck(tmp_path)
+    root = str(tmp_path / "cache")
+    paths = {("H", "A"): os.path.join(image_dir, "HA.png"), ("S", "K"): None}
+    assert manifest.load_manifest(image_dir, root) is None
+    assert manifest.write_manifest(image_dir, paths, os.path.join(image_dir, "back.png"), root)
+    assert manifest.load_manifest(image_dir, root) == (paths, os.path.join(image_dir, "back.png"))
+
+
+def test_stale_once_the_directory_changes(tmp_path):
+    image_dir = deck(tmp_path)
+    root = str(tmp_path / "cache")
+    manifest.write_manifest(image_dir, {("H", "A"): os.path.join(image_dir, "HA.png")}, None, root)
+    st = os.stat(image_dir)
+    os.utime(image_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # a file added or renamed
+    assert manifest.load_manifest(image_dir, root) is None
+
+
+def test_missing_directory(tmp_path):
+    gone = str(tmp_path / "nowhere")
+    assert manifest.write_manifest(gone, {}, None, str(tmp_path / "cache")) is None
+    assert manifest.load_manifest(gone, str(tmp_path / "cache")) is None
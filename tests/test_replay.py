@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+import engine
+import replay
+from engine import Klondike
+
+
+def record_game(path, seed, steps=400):
+    # Random play with some undos and redos; returns the final state
+    rng = random.Random(seed)
+    state = Klondike(engine.seeded_deck(seed))
+    with replay.ReplayWriter(path, seed) as writer:
+        for _ in range(steps):
+            roll = rng.random()
+            if roll < 0.1 and state.undo() is not None:
+                writer.undo()
+            elif roll < 0.15 and state.redo() is not None:
+                writer.redo()
+            else:
+                move = rng.choice(state.legal_moves())
+                state.apply(move)
+                writer.record(move)
+    return state
+
+
+@pytest.mark.parametrize("seed", [0, 9, 2**64 - 1])
+def test_round_trip(tmp_path, seed):
+    path = tmp_path / f"game{replay.REPLAY_SUFFIX}"
+    expected = record_game(path, seed)
+    rec, state = replay.replay(path)
+    assert rec.seed == seed
+    assert state.piles == expected.piles
+    assert state.down == expected.down
+
+
+def test_truncated_count_byte_is_dropped(tmp_path):
+    path = tmp_path / "cut.srpl"
+    with replay.ReplayWriter(path, 1) as writer:
+        writer.record(engine.DEAL)
+        writer.record(engine.make_move(engine.WASTE, engine.STOCK, 1))
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    assert list(replay.Replay(path)) == [engine.DEAL]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.srpl"
+    path.write_bytes(b"NOPE" + bytes(12))
+    with pytest.raises(ValueError):
+        replay.Replay(path)
+    path.write_bytes(b"SRPL")
+    with pytest.raises(ValueError):
+        replay.Replay(path)
+
+
+def test_encode_rejects_multi_card_single_moves():
+    with pytest.raises(ValueError):
+        replay.encode_move(engine.make_move(engine.WASTE, engine.TABLEAUS[0], 2))
+
+
+@pytest.mark.parametrize("seed", [-5, 2**64])
+def test_writer_rejects_seeds_outside_u64(tmp_path, seed):
+    with pytest.raises(ValueError):
+        replay.ReplayWriter(tmp_path / "big.srpl", seed)
@@ -0,0 +1,63 @@
+import os
+
+from resizecache import ResizedImageCache
+
+W, H = 3, 2
+PIXELS = bytes(range(W * H * 4))
+
+
+def source(tmp_path, name="card.png"):
+    path = tmp_path / "deck" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"not really a png")
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    src = source(tmp_path)
+    cache = ResizedImageCache(str(tmp_path / "cache"))
+    assert cache.get(src, W, H, 1) is None
+    cache.put(src, W, H, 1, PIXELS)
+    cache.flush()
+    assert cache.get(src, W, H, 1) == PIXELS
+    assert cache.get(src, W + 1, H, 1) is None  # other size
+    assert cache.get(src, W, H, 2) is None  # other filter
+    # a new instance finds the blob through the saved index
+    assert ResizedImageCache(str(tmp_path / "cache")).get(src, W, H, 1) == PIXELS
+
+
+def test_wrong_length_is_not_stored(tmp_path):
+    src = source(tmp_path)
+    cache = ResizedImageCache(str(tmp_path / "cache"))
+    cache.put(src, W, H, 1, PIXELS[:-1])
+    assert cache.get(src, W, H, 1) is None
+
+
+def test_edited_source_misses(tmp_path):
+    src = source(tmp_path)
+    cache = ResizedImageCache(str(tmp_path / "cache"))
+    cache.put(src, W, H, 1, PIXELS)
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert cache.get(src, W, H, 1) is None
+    # storing the new version replaces the old blob in the same slot
+    cache.put(src, W, H, 1, PIXELS[::-1])
+    cache.flush()
+    assert cache.get(src, W, H, 1) == PIXELS[::-1]
+    assert len([n for n in os.listdir(cache.dir) if n.endswith(".rgba")]) == 1
+
+
+def test_prune_drops_blobs_of_deleted_sources(tmp_path):
+    keep, gone = source(tmp_path, "keep.png"), source(tmp_path, "gone.png")
+    cache = ResizedImageCache(str(tmp_path / "cache"))
+    cache.put(keep, W, H, 1, PIXELS)
+    cache.put(gone, W, H, 1, PIXELS)
+    cache.flush()
+    os.remove(gone)
+    with open(os.path.join(cache.dir, "orphan.rgba"), "wb") as f:
+        f.write(b"left over")
+    cache.prune()
+    blobs = [n for n in os.listdir(cache.dir) if n.endswith(".rgba")]
+    assert len(blobs) == 1
+    assert list(cache.index.values()) == blobs
+    assert cache.get(keep, W, H, 1) == PIXELS
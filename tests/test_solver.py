@@ -0,0 +1,28 @@
+import pytest
+
+import engine
+import solver
+from engine import Klondike
+
+
+@pytest.mark.parametrize("seed", [0, 1, 7, 17])
+def test_solution_replays_to_a_win(seed):
+    result = solver.solve(engine.seeded_deck(seed), max_nodes=50_000)
+    assert result.solved
+    state = Klondike(engine.seeded_deck(seed))
+    for move in result.moves:
+        state.apply(move)  # checked: every step must be legal
+    assert state.is_won()
+
+
+def test_solver_leaves_the_state_alone():
+    state = Klondike(engine.seeded_deck(2))
+    before = [bytes(p) for p in state.piles]
+    solver.solve(state, max_nodes=50_000)
+    assert [bytes(p) for p in state.piles] == before
+
+
+def test_node_limit_gives_up():
+    result = solver.solve(engine.seeded_deck(14), max_nodes=100)
+    assert result.status == solver.GAVE_UP
+    assert result.moves == []
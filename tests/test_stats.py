@@ -0,0 +1,47 @@
+import time
+
+import stats
+
+
+def make_store(tmp_path):
+    return stats.StatsStore(str(tmp_path / "stats.sqlite3"), player="tester")
+
+
+def test_summary_and_streaks(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        for i, won in enumerate([True, True, False, True]):
+            store.record(i, 1000.0 + i, 60.0 + i, 100, won)
+        s = store.summary()
+        assert (s["games"], s["wins"], s["streak"], s["best_streak"]) == (4, 3, 1, 2)
+        assert s["best_time"] == 60.0
+        assert [row[2] for row in store.best_times()] == [0, 1, 3]
+        assert [row[4] for row in store.recent()] == [3, 2, 1, 0]
+    finally:
+        store.close()
+
+
+def test_full_range_of_deal_numbers(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        for seed in (0, 2**63 - 1, 2**63, 2**64 - 1):
+            store.record(seed, time.time(), 1.0, 10, True)
+        assert store.flush(timeout=2)
+        assert sorted(row[2] for row in store.best_times()) == [0, 2**63 - 1, 2**63, 2**64 - 1]
+    finally:
+        store.close()
+
+
+def test_writer_survives_a_bad_batch(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        store.record(2**70, time.time(), 1.0, 10, True)  # too big even for the wrapped column
+        start = time.monotonic()
+        assert store.flush(timeout=2)
+        store.record(7, time.time(), 1.0, 10, True)
+        assert store.flush(timeout=2)
+        assert time.monotonic() - start < 2
+        assert store.summary()["games"] == 1
+        assert store._thread.is_alive()
+    finally:
+        store.close()